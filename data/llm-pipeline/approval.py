@@ -1,35 +1,175 @@
+import argparse
 import json
 import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
 
+from checkpoint import course_hash
+from clusters import PARSER, cluster
 
-def review_flagged_courses(flagged_file, approved_file, review_file):
-    # helper to load or initialize a file
-    def load_json_file(filename):
-        if os.path.exists(filename):
-            with open(filename, "r") as f:
-                return json.load(f)
-        return []
+# coursescraper lives in the sibling scraper project
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scraper"))
 
-    # helper to append to a json file
-    def append_to_json_file(filename, entry):
-        data = load_json_file(filename)
-        data.append(entry)
+from coursescraper.schools import SCHOOLS, get_school  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+class ReviewStore:
+    """
+    Review decisions in SQLite, one row per flagged course keyed by department
+    + code. Deciding a course is a single indexed update, so a session costs
+    the same at the thousandth course as at the first, and quitting midway
+    keeps every decision made so far.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reviews (
+                department TEXT,
+                code TEXT,
+                hash TEXT NOT NULL,
+                course TEXT NOT NULL,
+                issues TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                decided_at REAL,
+                PRIMARY KEY (department, code)
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS reviews_status ON reviews (status, department)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS reviews_code ON reviews (code)"
+        )
+        self.connection.commit()
+
+    def import_flagged(self, flagged_file):
+        """
+        Loads index.py's flagged output (JSON Lines). Courses already decided
+        keep their decision unless the course itself changed since; pending
+        courses the file no longer lists (no longer flagged) leave the queue.
+        Returns how many courses are new or back to pending.
+        """
+        added = 0
+        flagged = set()
+        with open(flagged_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                course = entry["course"]
+                digest = course_hash(course)
+                flagged.add((course.get("department"), course.get("code")))
+                row = self.connection.execute(
+                    "SELECT hash FROM reviews WHERE department IS ? AND code IS ?",
+                    (course.get("department"), course.get("code")),
+                ).fetchone()
+                if row is not None and row[0] == digest:
+                    continue
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO reviews "
+                    "(department, code, hash, course, issues) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        course.get("department"),
+                        course.get("code"),
+                        digest,
+                        json.dumps(course),
+                        entry.get("issues"),
+                    ),
+                )
+                added += 1
+
+        stale = [
+            (rowid,)
+            for rowid, department, code in self.connection.execute(
+                "SELECT rowid, department, code FROM reviews WHERE status = 'pending'"
+            )
+            if (department, code) not in flagged
+        ]
+        self.connection.executemany("DELETE FROM reviews WHERE rowid = ?", stale)
+        self.connection.commit()
+        return added
+
+    def pending(self, department=None, issue=None):
+        """
+        Yields (rowid, course, issues) for undecided courses, a page at a time,
+        optionally only one department's or those whose issues mention `issue`.
+        """
+        query = "SELECT rowid, course, issues FROM reviews WHERE status = 'pending'"
+        params = []
+        if department:
+            query += " AND department = ?"
+            params.append(department)
+        if issue:
+            query += " AND issues LIKE ?"
+            params.append(f"%{issue}%")
+        query += " AND rowid > ? ORDER BY rowid LIMIT ?"
+
+        last = 0
+        while True:
+            rows = self.connection.execute(query, params + [last, PAGE_SIZE]).fetchall()
+            if not rows:
+                return
+            for rowid, course, issues in rows:
+                yield rowid, json.loads(course), issues
+            last = rows[-1][0]
+
+    def decide(self, rowid, status):
+        self.connection.execute(
+            "UPDATE reviews SET status = ?, decided_at = ? WHERE rowid = ?",
+            (status, time.time(), rowid),
+        )
+        self.connection.commit()
+
+    def decide_many(self, rowids, status):
+        now = time.time()
+        self.connection.executemany(
+            "UPDATE reviews SET status = ?, decided_at = ? WHERE rowid = ?",
+            [(status, now, rowid) for rowid in rowids],
+        )
+        self.connection.commit()
+
+    def counts(self):
+        return dict(
+            self.connection.execute(
+                "SELECT status, COUNT(*) FROM reviews GROUP BY status"
+            ).fetchall()
+        )
+
+    def export(self, status, filename):
+        """
+        Writes every course with this status to a JSON array file.
+        """
+        rows = self.connection.execute(
+            "SELECT course FROM reviews WHERE status = ? ORDER BY rowid", (status,)
+        )
         with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+            json.dump([json.loads(course) for (course,) in rows], f, indent=2)
 
-    # load flagged courses
-    with open(flagged_file, "r") as f:
-        flagged_courses = json.load(f)
+    def close(self):
+        self.connection.close()
+
+
+def clear_screen():
+    os.system("cls" if os.name == "nt" else "clear")
 
-    # review courses
-    for entry in flagged_courses:
-        course = entry["course"]
-        issues = entry["issues"]
 
+def review_courses(store, rows, remaining):
+    """
+    Asks about each (rowid, course, issues) in turn. Returns how many are
+    still pending afterwards, or None if the reviewer quit.
+    """
+    for rowid, course, issues in rows:
         # clear terminal for clean display
-        os.system("cls" if os.name == "nt" else "clear")
+        clear_screen()
 
-        print("\n--- Review Course ---\n")
+        print(f"\n--- Review Course ({remaining} pending) ---\n")
         print("Flagged Course:")
         print(json.dumps(course, indent=2))
         print("\nIssues:")
@@ -39,22 +179,172 @@ def review_flagged_courses(flagged_file, approved_file, review_file):
 
         # input approval choice
         choice = input(
-            "Approve ((a)pprove) or Send for Further Review ((r)eview)? "
+            "Approve ((a)pprove), Send for Further Review ((r)eview), "
+            "or (q)uit and resume later? "
         ).lower()
 
         if choice == "approve" or choice == "a":
-            append_to_json_file(approved_file, course)
+            store.decide(rowid, "approved")
+            remaining -= 1
             print("Course approved and added.")
         elif choice == "review" or choice == "r":
-            append_to_json_file(review_file, course)
+            store.decide(rowid, "review")
+            remaining -= 1
             print("Course sent for further review.")
+        elif choice == "quit" or choice == "q":
+            return None
         else:
             print("Invalid choice. Skipping course.")
+    return remaining
+
+
+def review_clusters(
+    store,
+    department=None,
+    issue=None,
+    threshold=0.6,
+    samples=5,
+    restriction_parser=PARSER,
+):
+    """
+    Groups the pending courses by similar issues and restriction text and
+    asks once per group; groups can still be opened and reviewed one by one.
+    restriction_parser is the school adapter's, for its code format.
+    """
+    rows = {
+        rowid: (course, issues)
+        for rowid, course, issues in store.pending(department, issue)
+    }
+    groups = cluster(
+        (
+            (rowid, issues, course.get("restrictions_text"))
+            for rowid, (course, issues) in rows.items()
+        ),
+        threshold=threshold,
+        restriction_parser=restriction_parser,
+    )
+
+    remaining = len(rows)
+    for number, group in enumerate(groups, 1):
+        clear_screen()
+        print(
+            f"\n--- Cluster {number}/{len(groups)}: {len(group)} courses "
+            f"({remaining} pending) ---\n"
+        )
+        for rowid in group[:samples]:
+            course, issues = rows[rowid]
+            print(f"{course.get('code')}: {course.get('restrictions_text')}")
+            print(f"    -> {issues}\n")
+        if len(group) > samples:
+            print(f"... and {len(group) - samples} more\n")
+        print("-" * 40)
+
+        choice = input(
+            "Approve all ((a)pprove), Send all for Further Review ((r)eview), "
+            "go (o)ne by one, (s)kip, or (q)uit? "
+        ).lower()
+
+        if choice in ("approve", "a"):
+            store.decide_many(group, "approved")
+        elif choice in ("review", "r"):
+            store.decide_many(group, "review")
+        elif choice in ("one", "o"):
+            members = [(rowid, *rows[rowid]) for rowid in group]
+            # counted down per course, skipped ones stay pending
+            remaining = review_courses(store, members, remaining)
+            if remaining is None:
+                return
+            continue
+        elif choice in ("quit", "q"):
+            return
+        else:
+            continue
+        remaining -= len(group)
+
+
+def review_flagged_courses(
+    flagged_file,
+    approved_file,
+    review_file,
+    store_file="review.sqlite",
+    department=None,
+    issue=None,
+    by_cluster=False,
+    threshold=0.6,
+    restriction_parser=PARSER,
+):
+    store = ReviewStore(store_file)
+    if os.path.exists(flagged_file):
+        store.import_flagged(flagged_file)
+
+    # review courses
+    try:
+        if by_cluster:
+            review_clusters(
+                store,
+                department,
+                issue,
+                threshold,
+                restriction_parser=restriction_parser,
+            )
+        else:
+            review_courses(
+                store,
+                store.pending(department, issue),
+                store.counts().get("pending", 0),
+            )
+    finally:
+        # the json files are rebuilt from the store once per session
+        store.export("approved", approved_file)
+        store.export("review", review_file)
+        counts = store.counts()
+        store.close()
+
+    print(
+        f"\nReview complete. {counts.get('approved', 0)} approved, "
+        f"{counts.get('review', 0)} sent for review, "
+        f"{counts.get('pending', 0)} still pending."
+    )
 
-    print("\nReview complete.")
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Review flagged courses by hand.")
+    parser.add_argument("--flagged", default="flagged_courses.json")
+    parser.add_argument("--approved", default="manually_approved_courses.json")
+    parser.add_argument("--review", default="further_review.json")
+    parser.add_argument("--store", default="review.sqlite")
+    parser.add_argument("--department", help="only review this department, e.g. CSC")
+    parser.add_argument(
+        "--issue", help="only review courses whose issues mention this text"
+    )
+    parser.add_argument(
+        "--clusters",
+        action="store_true",
+        help="group similar flagged courses and decide a whole group at once",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.6,
+        help="similarity needed to put two courses in one group (--clusters)",
+    )
+    parser.add_argument(
+        "--school",
+        default="ncsu",
+        choices=sorted(SCHOOLS),
+        help="code format, for grouping (--clusters)",
+    )
+    args = parser.parse_args()
 
-# run review
-review_flagged_courses(
-    "flagged_courses.json", "manually_approved_courses.json", "further_review.json"
-)
+    # run review
+    review_flagged_courses(
+        args.flagged,
+        args.approved,
+        args.review,
+        args.store,
+        department=args.department,
+        issue=args.issue,
+        by_cluster=args.clusters,
+        threshold=args.threshold,
+        restriction_parser=get_school(args.school).restriction_parser,
+    )
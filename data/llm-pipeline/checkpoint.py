@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+from threading import Lock
+
+
+def course_hash(course):
+    normalized = json.dumps(course, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class Checkpoint:
+    """
+    Append-only journal of verdicts (course code + input hash + verdict) so an
+    interrupted run can pick up where it stopped. A course is only skipped when
+    its hash still matches, so edited courses get validated again. Courses are
+    keyed by department + code (cross-listings share a code) and later lines
+    win, so re-validated courses simply append a new entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.entries = {}
+        torn = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # torn last line from a crash mid-write
+                        continue
+                    self.entries[(entry["department"], entry["code"])] = entry
+        self.file = open(path, "a", encoding="utf-8")
+        if torn:
+            self.file.write("\n")
+
+    def lookup(self, course):
+        """
+        Returns the journaled entry for this exact course, or None.
+        """
+        entry = self.entries.get((course.get("department"), course.get("code")))
+        if entry is not None and entry["hash"] == course_hash(course):
+            return entry
+        return None
+
+    def record(self, course, verdict, issues=None):
+        entry = {
+            "department": course.get("department"),
+            "code": course.get("code"),
+            "hash": course_hash(course),
+            "verdict": verdict,
+            "issues": issues,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def clear(path):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,126 @@
+import hashlib
+import random
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# coursescraper lives in the sibling scraper project
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scraper"))
+
+from coursescraper.restrictions import RestrictionParser  # noqa: E402
+
+PARSER = RestrictionParser()
+NUMBER = re.compile(r"\d+")
+WORD = re.compile(r"[a-z<>]+")
+
+MERSENNE = (1 << 61) - 1
+NUM_PERM = 64
+BANDS = 16
+SHINGLE = 3
+
+
+def normalize(text, restriction_parser=PARSER):
+    """
+    Lowercased words with course codes (in the school's format) and numbers
+    replaced by placeholders, so "CSC 116 not listed" and "MA 141 not listed"
+    read the same.
+    """
+    text = text or ""
+    parts = []
+    position = 0
+    for _, (start, end) in restriction_parser.explicit_codes(text):
+        parts += [text[position:start], " <code> "]
+        position = end
+    text = "".join(parts) + text[position:]
+    text = NUMBER.sub(" <n> ", text)
+    return WORD.findall(text.lower())
+
+
+def shingles(words, size=SHINGLE):
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles: each shingle is hashed once, then
+    NUM_PERM random affine permutations mod a Mersenne prime stand in for
+    independent hash functions.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, MERSENNE), rng.randrange(0, MERSENNE))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens):
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(token.encode(), digest_size=8).digest(), "big"
+            )
+            for token in tokens
+        ]
+        return tuple(
+            min((a * h + b) % MERSENNE for h in hashes) for a, b in self.permutations
+        )
+
+
+def similarity(first, second):
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+def cluster(entries, threshold=0.6, bands=BANDS, restriction_parser=PARSER):
+    """
+    Groups (key, issues, restrictions_text) entries whose issue text and
+    restriction pattern are near-duplicates. Candidate pairs come from LSH
+    banding of the signatures. Each group is represented by its first entry,
+    and two groups only merge when every entry of one reaches the estimated
+    Jaccard threshold against the other's representative, so A~B and B~C
+    don't chain A and C together. Returns lists of keys, largest first.
+    restriction_parser is the school adapter's, for its code format.
+    """
+    hasher = MinHasher()
+    keys = []
+    signatures = []
+    for key, issues, restrictions_text in entries:
+        # prefixed so issue and restriction shingles never collide
+        tokens = {"i:" + s for s in shingles(normalize(issues, restriction_parser))}
+        restriction_words = normalize(restrictions_text, restriction_parser)
+        tokens |= {"r:" + s for s in shingles(restriction_words)}
+        keys.append(key)
+        signatures.append(hasher.signature(tokens))
+
+    # representative -> entries, and entry -> its group's representative
+    groups = {i: [i] for i in range(len(keys))}
+    representative = list(range(len(keys)))
+
+    def merge(a, b):
+        # b's entries join a's group if they are all close to a's representative
+        if any(similarity(signatures[a], signatures[i]) < threshold for i in groups[b]):
+            return False
+        for i in groups[b]:
+            representative[i] = a
+        groups[a].extend(groups.pop(b))
+        return True
+
+    rows = NUM_PERM // bands
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            buckets[signature[band * rows : (band + 1) * rows]].append(i)
+        for members in buckets.values():
+            for position, other in enumerate(members[1:], 1):
+                b = representative[other]
+                for a in dict.fromkeys(representative[i] for i in members[:position]):
+                    if a != b and (merge(a, b) or merge(b, a)):
+                        break
+
+    return sorted(
+        ([keys[i] for i in group] for group in groups.values()),
+        key=len,
+        reverse=True,
+    )
@@ -0,0 +1,12 @@
+"""
+Course exports are read with the scraper's own reader (coursescraper.catalog),
+so JSON Lines files and JSON arrays stream the same way in both projects.
+"""
+
+import sys
+from pathlib import Path
+
+# coursescraper lives in the sibling scraper project
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scraper"))
+
+from coursescraper.catalog import iter_courses  # noqa: E402
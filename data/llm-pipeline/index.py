@@ -1,25 +1,44 @@
+import argparse
+import asyncio
 import json
+import random
 import re
+import sys
 import ollama
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path
 from threading import Lock
 
+import prefilter
+from checkpoint import Checkpoint
+from courses import iter_courses
+from limiter import AdaptiveLimiter
+from output import OutputSink
+from verdict_cache import VerdictCache
 
-def validate_restrictions(course, progress_counter, lock, approved_file, flagged_file):
-    restrictions_text = course.get("restrictions_text", None)
-    if not restrictions_text:
-        with lock:
-            progress_counter["processed"] += 1
-        # append to approved file immediately
-        with open(approved_file, "a") as f:
-            f.write(json.dumps(course) + "\n")
-        return
+# coursescraper lives in the sibling scraper project
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scraper"))
 
-    prompt = f"""
-        You are validating course data. The course is:
-        {json.dumps(course, indent=2)}
+from coursescraper.schools import SCHOOLS, get_school  # noqa: E402
+
+MODEL = "llama3.2:3b"
+# bump whenever the prompts change so cached verdicts aren't reused
+PROMPT_VERSION = 1
 
-        Focus on the "prerequisites", "corequisites", and "other_restrictions" fields.
+
+# course fields sent in batch prompts; the rest of the course only costs tokens
+BATCH_FIELDS = (
+    "code",
+    "name",
+    "restrictions_text",
+    "prerequisites",
+    "corequisites",
+    "other_restrictions",
+)
+
+# what the model checks, shared by the single-course and batch prompts
+CRITERIA = """        Focus on the "prerequisites", "corequisites", and "other_restrictions" fields.
         Check:
         1. Does it make sense? 
         2. Are there inconsistencies like graduate-level courses as prerequisites for undergrad courses?
@@ -41,73 +60,749 @@ def validate_restrictions(course, progress_counter, lock, approved_file, flagged
         I do not care at all if the pre req and co req themselves are valid,
         or if they make sense in the abstract. 
         I just need the prereq and coreq array to be reasonable translations of the restrictions text.
-        That is the only thing that matters.
+        That is the only thing that matters."""
+
+
+def build_prompt(course):
+    return f"""
+        You are validating course data. The course is:
+        {json.dumps(course, indent=2)}
+
+{CRITERIA}
 
         As long as all of that is true, respond with "VALID". Otherwise, list specific issues.
     
         To reiterate,
         Respond with "VALID" if it looks correct, or list specific issues.
         """
-    print("started ollama read")
-    response = ollama.generate(model="llama3.2:3b", prompt=prompt)
-    print("finished ollama write")
 
+
+def parse_response(response):
+    """
+    Returns ("approved", None) or ("flagged", issues).
+    """
     response_content = response["response"].strip()
 
     # check for "VALID"
     if re.search(r"\bVALID\b", response_content, re.IGNORECASE):
+        return "approved", None
+    return "flagged", response_content
+
+
+def build_batch_prompt(courses):
+    entries = [
+        {field: course.get(field) for field in BATCH_FIELDS} for course in courses
+    ]
+    return f"""
+        You are validating course data for {len(courses)} courses. The courses are:
+        {json.dumps(entries, indent=2)}
+
+{CRITERIA}
+
+        Judge every course on its own.
+        Respond with JSON only, in exactly this form, with one entry per course:
+        {{"results": [{{"code": "<course code>", "valid": true, "issues": ""}}]}}
+        Set "valid" to true if the course looks correct. Otherwise set it to false
+        and list the specific issues in "issues".
+        """
+
+
+def normalize_code(code):
+    return re.sub(r"\s+", "", str(code)).upper()
+
+
+def parse_batch_response(response, courses):
+    """
+    Returns one ("approved", None) / ("flagged", issues) per course, or None
+    for each course the batch answer doesn't cover cleanly.
+    """
+    try:
+        data = json.loads(response["response"])
+    except (json.JSONDecodeError, TypeError):
+        return [None] * len(courses)
+    results = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(results, list):
+        return [None] * len(courses)
+
+    answers = {}
+    for result in results:
+        if isinstance(result, dict) and result.get("code") is not None:
+            code = normalize_code(result["code"])
+            # a code answered twice is ambiguous
+            answers[code] = None if code in answers else result
+
+    codes = Counter(normalize_code(course.get("code")) for course in courses)
+    verdicts = []
+    for course in courses:
+        code = normalize_code(course.get("code"))
+        result = answers.get(code) if codes[code] == 1 else None
+        if result is None or not isinstance(result.get("valid"), bool):
+            verdicts.append(None)
+        elif result["valid"]:
+            verdicts.append(("approved", None))
+        else:
+            issues = str(result.get("issues") or "").strip()
+            verdicts.append(("flagged", issues or "flagged without details"))
+    return verdicts
+
+
+def ask_model(course):
+    print("started ollama read")
+    response = ollama.generate(model=MODEL, prompt=build_prompt(course))
+    print("finished ollama write")
+    return parse_response(response)
+
+
+def ask_model_batch(courses):
+    print(f"started ollama read ({len(courses)} courses)")
+    response = ollama.generate(
+        model=MODEL, prompt=build_batch_prompt(courses), format="json"
+    )
+    print("finished ollama write")
+    return parse_batch_response(response, courses)
+
+
+def is_transient(error):
+    """
+    Whether a failed model call is worth retrying: timeouts, connection errors
+    and 429/5xx responses. Anything else (missing model, bad request) fails the
+    same way again.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+async def request_model_async(client, limiter, timeout, retries, label, **kwargs):
+    for attempt in range(retries + 1):
+        try:
+            async with limiter.slot():
+                return await asyncio.wait_for(
+                    client.generate(model=MODEL, **kwargs), timeout
+                )
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                raise
+            delay = 2**attempt + random.random()
+            print(f"Retrying {label} in {delay:.1f}s after: {e!r}")
+            await asyncio.sleep(delay)
+
+
+async def ask_model_async(client, course, limiter, timeout, retries):
+    response = await request_model_async(
+        client,
+        limiter,
+        timeout,
+        retries,
+        course.get("code"),
+        prompt=build_prompt(course),
+    )
+    return parse_response(response)
+
+
+async def ask_model_batch_async(client, courses, limiter, timeout, retries):
+    response = await request_model_async(
+        client,
+        limiter,
+        timeout,
+        retries,
+        f"batch of {len(courses)}",
+        prompt=build_batch_prompt(courses),
+        format="json",
+    )
+    return parse_batch_response(response, courses)
+
+
+def record_verdict(course, verdict, issues, sink, checkpoint):
+    if verdict == "approved":
         # append to approved file
-        with open(approved_file, "a") as f:
-            f.write(json.dumps(course) + "\n")
+        sink.approved(course)
     else:
         # append to flagged file
-        with open(flagged_file, "a") as f:
-            f.write(json.dumps({"course": course, "issues": response_content}) + "\n")
+        sink.flagged(course, issues)
+    if checkpoint:
+        checkpoint.record(course, verdict, issues)
+
+
+def load_structural(path):
+    """
+    (department, code) -> issues from `python -m coursescraper.structure`.
+    """
+    issues = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                issues[(entry["department"], entry["code"])] = entry["issues"]
+    return issues
+
+
+def settle_without_model(
+    course, sink, checkpoint, use_prefilter, structural=None, restriction_parser=None
+):
+    """
+    Writes the course out if the structural report, the checkpoint or the
+    prefilter already has a verdict, returning "structural"/"resumed"/
+    "prefiltered", or None if the model is needed. restriction_parser is the
+    school adapter's, for the prefilter.
+    """
+    # catalog-wide problems the model can't see from a single course
+    issues = structural and structural.get(
+        (course.get("department"), course.get("code"))
+    )
+    if issues:
+        sink.flagged(course, "structural: " + "; ".join(issues))
+        return "structural"
+
+    entry = checkpoint.lookup(course) if checkpoint else None
+    if entry is not None:
+        if entry["verdict"] == "approved":
+            sink.approved(course)
+        else:
+            sink.flagged(course, entry["issues"])
+        return "resumed"
+
+    # clear-cut courses never reach the model
+    if use_prefilter and course.get("restrictions_text"):
+        verdict, issues = prefilter.check(
+            course, restriction_parser or prefilter.PARSER
+        )
+        if verdict == "approved":
+            sink.approved(course)
+        elif verdict == "flagged":
+            sink.flagged(course, issues)
+        if verdict is not None:
+            return "prefiltered"
+
+    return None
+
+
+def validate_restrictions(
+    course,
+    progress_counter,
+    lock,
+    sink,
+    checkpoint=None,
+    cache=None,
+):
+    restrictions_text = course.get("restrictions_text", None)
+    if not restrictions_text:
+        with lock:
+            progress_counter["processed"] += 1
+        # append to approved file immediately
+        sink.approved(course)
+        return
+
+    key = VerdictCache.key(MODEL, PROMPT_VERSION, course) if cache else None
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        verdict, issues = cached
+    else:
+        verdict, issues = ask_model(course)
+        if cache:
+            cache.put(key, verdict, issues)
+
+    record_verdict(course, verdict, issues, sink, checkpoint)
 
     with lock:
         progress_counter["processed"] += 1
+        if cached is not None:
+            progress_counter["cached"] += 1
 
 
-def process_courses_parallel(input_file, approved_file, flagged_file, max_workers=3):
-    with open(input_file, "r") as f:
-        courses = json.load(f)
+async def validate_restrictions_async(
+    course,
+    client,
+    limiter,
+    progress_counter,
+    lock,
+    sink,
+    checkpoint=None,
+    cache=None,
+    timeout=300,
+    retries=3,
+):
+    # the cache (sqlite) and the checkpoint (file appends) block, so they run
+    # in threads; lock guards progress_counter against those threads
+    if not course.get("restrictions_text"):
+        with lock:
+            progress_counter["processed"] += 1
+        sink.approved(course)
+        return
+
+    key = VerdictCache.key(MODEL, PROMPT_VERSION, course) if cache else None
+    cached = await asyncio.to_thread(cache.get, key) if cache else None
+    if cached is not None:
+        verdict, issues = cached
+    else:
+        verdict, issues = await ask_model_async(
+            client, course, limiter, timeout, retries
+        )
+        if cache:
+            await asyncio.to_thread(cache.put, key, verdict, issues)
+
+    await asyncio.to_thread(record_verdict, course, verdict, issues, sink, checkpoint)
+    with lock:
+        progress_counter["processed"] += 1
+        if cached is not None:
+            progress_counter["cached"] += 1
+
+
+def prepare_batch(courses, progress_counter, lock, sink, checkpoint, cache):
+    """
+    Settles the courses of a batch that don't need the model (no restrictions,
+    cached verdict) and returns (course, cache key) pairs for the rest.
+    """
+    to_ask = []
+    for course in courses:
+        if not course.get("restrictions_text"):
+            sink.approved(course)
+            with lock:
+                progress_counter["processed"] += 1
+            continue
+
+        # batch answers come from a different prompt, so they're cached apart
+        key = None
+        if cache:
+            key = VerdictCache.key(MODEL, PROMPT_VERSION, course, "batch")
+        cached = cache.get(key) if cache else None
+        if cached is None:
+            to_ask.append((course, key))
+            continue
+
+        verdict, issues = cached
+        record_verdict(course, verdict, issues, sink, checkpoint)
+        with lock:
+            progress_counter["processed"] += 1
+            progress_counter["cached"] += 1
+    return to_ask
+
+
+def finish_batch(
+    to_ask,
+    results,
+    progress_counter,
+    lock,
+    sink,
+    checkpoint,
+    cache,
+):
+    for (course, key), (verdict, issues) in zip(to_ask, results):
+        if cache:
+            cache.put(key, verdict, issues)
+        record_verdict(course, verdict, issues, sink, checkpoint)
+        with lock:
+            progress_counter["processed"] += 1
+
+
+def validate_batch(
+    courses,
+    progress_counter,
+    lock,
+    sink,
+    checkpoint=None,
+    cache=None,
+):
+    to_ask = prepare_batch(courses, progress_counter, lock, sink, checkpoint, cache)
+    if not to_ask:
+        return
+
+    try:
+        results = ask_model_batch([course for course, _ in to_ask])
+    except Exception as e:
+        # don't lose the whole batch, ask about each course alone below
+        print(f"Batch of {len(to_ask)} failed, asking per course: {e!r}")
+        results = [None] * len(to_ask)
+    for i, result in enumerate(results):
+        if result is None:
+            # the batch answer was unusable for this course, ask about it alone
+            course = to_ask[i][0]
+            results[i] = ask_model(course)
+            # answered by the single-course prompt, cache it as one
+            to_ask[i] = (course, VerdictCache.key(MODEL, PROMPT_VERSION, course))
+            with lock:
+                progress_counter["fallbacks"] += 1
+
+    finish_batch(
+        to_ask,
+        results,
+        progress_counter,
+        lock,
+        sink,
+        checkpoint,
+        cache,
+    )
+
+
+async def validate_batch_async(
+    courses,
+    client,
+    limiter,
+    progress_counter,
+    lock,
+    sink,
+    checkpoint=None,
+    cache=None,
+    timeout=300,
+    retries=3,
+):
+    # cache and checkpoint I/O runs in threads, see validate_restrictions_async
+    to_ask = await asyncio.to_thread(
+        prepare_batch, courses, progress_counter, lock, sink, checkpoint, cache
+    )
+    if not to_ask:
+        return
+
+    try:
+        results = await ask_model_batch_async(
+            client, [course for course, _ in to_ask], limiter, timeout, retries
+        )
+    except Exception as e:
+        # don't lose the whole batch, ask about each course alone below
+        print(f"Batch of {len(to_ask)} failed, asking per course: {e!r}")
+        results = [None] * len(to_ask)
+    for i, result in enumerate(results):
+        if result is None:
+            # the batch answer was unusable for this course, ask about it alone
+            course = to_ask[i][0]
+            results[i] = await ask_model_async(
+                client, course, limiter, timeout, retries
+            )
+            # answered by the single-course prompt, cache it as one
+            to_ask[i] = (course, VerdictCache.key(MODEL, PROMPT_VERSION, course))
+            with lock:
+                progress_counter["fallbacks"] += 1
+
+    await asyncio.to_thread(
+        finish_batch,
+        to_ask,
+        results,
+        progress_counter,
+        lock,
+        sink,
+        checkpoint,
+        cache,
+    )
+
+
+def process_courses_parallel(
+    input_file,
+    sink,
+    max_workers=3,
+    max_pending=None,
+    checkpoint_file=None,
+    cache=None,
+    use_prefilter=True,
+    batch_size=1,
+    structural=None,
+    restriction_parser=None,
+):
+    # at most max_pending courses (or batches) are read ahead of the workers, so
+    # memory stays flat no matter how big the catalog is
+    max_pending = max_pending or max_workers * 4
+
+    # verdicts from earlier (possibly interrupted) runs; outputs are rebuilt every
+    # run, so journaled courses are rewritten from the journal without the model
+    checkpoint = Checkpoint(checkpoint_file) if checkpoint_file else None
 
     # initialize progress counter and lock
-    progress_counter = {"processed": 0}
+    progress_counter = new_progress_counter()
     lock = Lock()
 
-    # clear or create output files
-    open(approved_file, "w").close()
-    open(flagged_file, "w").close()
+    def report(done):
+        for future in done:
+            try:
+                future.result()  # trigger exception handling if something went wrong
+            except Exception as e:
+                print(f"Error in processing: {e}")
+
+            # log progress periodically
+            with lock:
+                if progress_counter["processed"] % 10 == 0:
+                    print(f"Processed {progress_counter['processed']}")
 
     # use ThreadPoolExecutor to parallelize
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(
-                validate_restrictions,
-                course,
-                progress_counter,
-                lock,
-                approved_file,
-                flagged_file,
+        pending = set()
+
+        def submit(validate, work):
+            nonlocal pending
+            if len(pending) >= max_pending:
+                # backpressure: wait for a worker before reading further
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                report(done)
+
+            pending.add(
+                executor.submit(
+                    validate,
+                    work,
+                    progress_counter,
+                    lock,
+                    sink,
+                    checkpoint,
+                    cache,
+                )
             )
-            for course in courses
-        ]
 
-        for future in as_completed(futures):
+        batch = []
+        for course in iter_courses(input_file):
+            settled = settle_without_model(
+                course, sink, checkpoint, use_prefilter, structural, restriction_parser
+            )
+            if settled:
+                progress_counter[settled] += 1
+            elif batch_size > 1:
+                batch.append(course)
+                if len(batch) == batch_size:
+                    submit(validate_batch, batch)
+                    batch = []
+            else:
+                submit(validate_restrictions, course)
+        if batch:
+            submit(validate_batch, batch)
+
+        report(as_completed(pending))
+
+    if checkpoint:
+        checkpoint.close()
+    print_summary(progress_counter)
+
+
+async def process_courses_async(
+    input_file,
+    sink,
+    max_concurrency=16,
+    max_pending=None,
+    checkpoint_file=None,
+    cache=None,
+    use_prefilter=True,
+    timeout=300,
+    retries=3,
+    batch_size=1,
+    structural=None,
+    restriction_parser=None,
+):
+    """
+    asyncio version of process_courses_parallel. Instead of a fixed worker
+    count, an AdaptiveLimiter finds how many concurrent requests the model
+    server can take, up to max_concurrency.
+    """
+    max_pending = max_pending or max_concurrency * 4
+    checkpoint = Checkpoint(checkpoint_file) if checkpoint_file else None
+    progress_counter = new_progress_counter()
+    client = ollama.AsyncClient()
+    # only transient failures mean the server is overloaded
+    limiter = AdaptiveLimiter(maximum=max_concurrency, overloaded=is_transient)
+    lock = Lock()
+    queue = asyncio.Queue(maxsize=max_pending)
+
+    async def worker():
+        while True:
+            work = await queue.get()
+            validate = (
+                validate_batch_async
+                if isinstance(work, list)
+                else validate_restrictions_async
+            )
             try:
-                future.result()  # trigger exception handling if something went wrong
+                await validate(
+                    work,
+                    client,
+                    limiter,
+                    progress_counter,
+                    lock,
+                    sink,
+                    checkpoint,
+                    cache,
+                    timeout,
+                    retries,
+                )
             except Exception as e:
                 print(f"Error in processing: {e}")
+            finally:
+                queue.task_done()
 
             # log progress periodically
+            if progress_counter["processed"] % 10 == 0:
+                print(
+                    f"Processed {progress_counter['processed']} "
+                    f"(concurrency limit {limiter.limit})"
+                )
+
+    # the limiter caps actual model calls, so one worker per possible slot
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    batch = []
+    for course in iter_courses(input_file):
+        settled = settle_without_model(
+            course, sink, checkpoint, use_prefilter, structural, restriction_parser
+        )
+        if settled:
             with lock:
-                if progress_counter["processed"] % 10 == 0:
-                    print(
-                        f"Processed {progress_counter['processed']} of {len(courses)}"
-                    )
+                progress_counter[settled] += 1
+        elif batch_size > 1:
+            batch.append(course)
+            if len(batch) == batch_size:
+                # backpressure: blocks while max_pending batches are queued
+                await queue.put(batch)
+                batch = []
+        else:
+            # backpressure: blocks while max_pending courses are queued
+            await queue.put(course)
+    if batch:
+        await queue.put(batch)
 
+    await queue.join()
+    for task in workers:
+        task.cancel()
 
-process_courses_parallel(
-    "ncsu_courses.json", "approved_courses.json", "flagged_courses.json", max_workers=2
-)
+    if checkpoint:
+        checkpoint.close()
+    print_summary(progress_counter)
+
+
+def new_progress_counter():
+    return {
+        "processed": 0,
+        "cached": 0,
+        "fallbacks": 0,
+        "resumed": 0,
+        "prefiltered": 0,
+        "structural": 0,
+    }
+
+
+def print_summary(progress_counter):
+    print(
+        f"Processed {progress_counter['processed']} courses "
+        f"({progress_counter['cached']} from the verdict cache, "
+        f"{progress_counter['fallbacks']} batch fallbacks), "
+        f"{progress_counter['structural']} flagged by the structural report, "
+        f"{progress_counter['prefiltered']} settled by the prefilter, "
+        f"{progress_counter['resumed']} restored from checkpoint"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate parsed course restrictions.")
+    parser.add_argument(
+        "input_file",
+        nargs="?",
+        default="ncsu_courses.json",
+        help="coursespider export, JSON array or JSON Lines",
+    )
+    parser.add_argument("--approved", default="approved_courses.json")
+    parser.add_argument("--flagged", default="flagged_courses.json")
+    parser.add_argument(
+        "--parquet", help="also write every verdict to this Parquet file (pyarrow)"
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="use the async client with adaptive concurrency instead of --workers",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=16,
+        help="upper bound for the adaptive limit in --async mode",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="courses per prompt; unreadable batch answers fall back to one at a time",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="seconds per model request (--async)"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=3, help="retries per model request (--async)"
+    )
+    parser.add_argument("--checkpoint", default="validation_checkpoint.jsonl")
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="discard the checkpoint and validate everything again",
+    )
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="send every course to the model, even clear-cut ones",
+    )
+    parser.add_argument(
+        "--structural",
+        help="issues from `python -m coursescraper.structure`; those courses are "
+        "flagged without the model",
+    )
+    parser.add_argument(
+        "--school",
+        default="ncsu",
+        choices=sorted(SCHOOLS),
+        help="code format the prefilter reads the restrictions with",
+    )
+    parser.add_argument("--cache", default="verdict_cache.sqlite")
+    parser.add_argument("--no-cache", action="store_true", help="always ask the model")
+    parser.add_argument("--cache-max-age-days", type=float, default=180)
+    parser.add_argument("--cache-max-entries", type=int, default=200_000)
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        help="courses read ahead of the workers (default: 4 per worker)",
+    )
+    args = parser.parse_args()
+
+    if args.no_resume:
+        Checkpoint.clear(args.checkpoint)
+
+    cache = None
+    if not args.no_cache:
+        cache = VerdictCache(
+            args.cache, args.cache_max_age_days, args.cache_max_entries
+        )
+        cache.evict()
+
+    structural = load_structural(args.structural) if args.structural else None
+    restriction_parser = get_school(args.school).restriction_parser
+
+    # one writer thread owns the outputs; they are swapped in whole on close
+    sink = OutputSink(args.approved, args.flagged, args.parquet)
+    try:
+        if args.use_async:
+            asyncio.run(
+                process_courses_async(
+                    args.input_file,
+                    sink,
+                    max_concurrency=args.max_concurrency,
+                    max_pending=args.max_pending,
+                    checkpoint_file=args.checkpoint,
+                    cache=cache,
+                    use_prefilter=not args.no_prefilter,
+                    structural=structural,
+                    restriction_parser=restriction_parser,
+                    timeout=args.timeout,
+                    retries=args.retries,
+                    batch_size=args.batch_size,
+                )
+            )
+        else:
+            process_courses_parallel(
+                args.input_file,
+                sink,
+                max_workers=args.workers,
+                max_pending=args.max_pending,
+                checkpoint_file=args.checkpoint,
+                cache=cache,
+                use_prefilter=not args.no_prefilter,
+                structural=structural,
+                restriction_parser=restriction_parser,
+                batch_size=args.batch_size,
+            )
+    finally:
+        # an interrupted run still gets whole-line outputs
+        sink.close()
+    if cache:
+        cache.close()
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for calls to the local model server.
+
+    After every window of completed calls (twice the current limit) the
+    throughput of that window is compared with the previous one: if it went
+    up by more than `tolerance` the limit grows by one, otherwise it steps
+    back by one and probes again, so it hovers around the point where more
+    parallel requests stop helping. A failed or timed-out call halves the
+    limit straight away, unless overloaded(error) says the failure has nothing
+    to do with load; those calls count neither way.
+    """
+
+    def __init__(
+        self, initial=1, minimum=1, maximum=16, tolerance=0.05, overloaded=None
+    ):
+        self.limit = initial
+        self.overloaded = overloaded or (lambda error: True)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+        self.previous_throughput = None
+        self.reset_window()
+
+    def reset_window(self):
+        self.window_start = time.monotonic()
+        self.window_completed = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            async with self.condition:
+                self.in_flight -= 1
+                if error is None:
+                    self.completed()
+                elif self.overloaded(error):
+                    self.failed()
+                self.condition.notify_all()
+
+    def completed(self):
+        self.window_completed += 1
+        if self.window_completed < self.limit * 2:
+            return
+
+        elapsed = time.monotonic() - self.window_start
+        throughput = self.window_completed / elapsed if elapsed else float("inf")
+        if (
+            self.previous_throughput is None
+            or throughput > self.previous_throughput * (1 + self.tolerance)
+        ):
+            self.limit = min(self.maximum, self.limit + 1)
+            self.previous_throughput = throughput
+        else:
+            # back to the last good limit, and probe upwards again from there
+            self.limit = max(self.minimum, self.limit - 1)
+            self.previous_throughput = None
+        self.reset_window()
+
+    def failed(self):
+        self.limit = max(self.minimum, self.limit // 2)
+        self.previous_throughput = None
+        self.reset_window()
@@ -0,0 +1,186 @@
+import json
+import os
+import queue
+import threading
+import time
+
+PARQUET_COLUMNS = ("department", "code", "verdict", "issues", "course")
+
+
+class OutputSink:
+    """
+    Single writer for the approved/flagged outputs. Workers only put verdicts
+    on a queue; one thread owns both files, writes whatever has queued up in
+    one go and fsyncs at most every sync_every seconds.
+
+    Lines go to "<file>.partial" and only whole lines are ever written, and
+    close() renames the partial files over the real ones, so the outputs are
+    never torn: an interrupted run leaves either complete JSON Lines or the
+    previous run's files (the checkpoint rebuilds them on the next run).
+
+    With parquet_file set every verdict also goes to a compact columnar file,
+    written in row groups of parquet_row_group rows (needs pyarrow).
+    """
+
+    def __init__(
+        self,
+        approved_file,
+        flagged_file,
+        parquet_file=None,
+        sync_every=5.0,
+        max_queued=10_000,
+        parquet_row_group=10_000,
+    ):
+        self.paths = {"approved": approved_file, "flagged": flagged_file}
+        if parquet_file:
+            self.paths["parquet"] = parquet_file
+        self.sync_every = sync_every
+        self.parquet_row_group = parquet_row_group
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.error = None
+        self.closed = False
+
+        self.parquet = open_parquet(partial(parquet_file)) if parquet_file else None
+        self.files = {
+            kind: open(partial(path), "w", encoding="utf-8")
+            for kind, path in self.paths.items()
+            if kind != "parquet"
+        }
+        self.parquet_rows = []
+
+        self.thread = threading.Thread(target=self.run, name="output-sink", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def approved(self, course):
+        self.put(("approved", course, None))
+
+    def flagged(self, course, issues):
+        self.put(("flagged", course, issues))
+
+    def put(self, record):
+        if self.error is not None:
+            raise RuntimeError("output writer failed") from self.error
+        # blocks when the writer falls behind by max_queued verdicts
+        self.queue.put(record)
+
+    def run(self):
+        last_sync = time.monotonic()
+        stopping = False
+        while not stopping:
+            records = [self.queue.get()]
+            # drain everything already queued so it goes out in one write
+            while True:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if records[-1] is None:
+                stopping = True
+                records.pop()
+
+            try:
+                self.write(records)
+                if stopping or time.monotonic() - last_sync >= self.sync_every:
+                    self.sync()
+                    last_sync = time.monotonic()
+            except Exception as e:
+                self.error = e
+                # keep draining so producers never block on a dead writer
+                while not stopping:
+                    stopping = self.queue.get() is None
+
+    def write(self, records):
+        lines = {"approved": [], "flagged": []}
+        for kind, course, issues in records:
+            if kind == "approved":
+                lines[kind].append(json.dumps(course) + "\n")
+            else:
+                lines[kind].append(
+                    json.dumps({"course": course, "issues": issues}) + "\n"
+                )
+            if self.parquet:
+                self.parquet_rows.append(
+                    (
+                        course.get("department"),
+                        course.get("code"),
+                        kind,
+                        issues,
+                        json.dumps(course, ensure_ascii=False),
+                    )
+                )
+
+        for kind, chunk in lines.items():
+            if chunk:
+                self.files[kind].write("".join(chunk))
+        if len(self.parquet_rows) >= self.parquet_row_group:
+            self.write_parquet()
+
+    def write_parquet(self):
+        if self.parquet_rows:
+            self.parquet.write(self.parquet_rows)
+            self.parquet_rows = []
+
+    def sync(self):
+        for f in self.files.values():
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+        if self.error is None and self.parquet:
+            try:
+                self.write_parquet()
+                self.parquet.close()
+            except Exception as e:
+                self.error = e
+        for f in self.files.values():
+            f.close()
+        if self.error is not None:
+            # leave the partial files for inspection, the real ones untouched
+            raise RuntimeError("output writer failed") from self.error
+
+        for path in self.paths.values():
+            os.replace(partial(path), path)
+
+
+def partial(path):
+    return path + ".partial"
+
+
+def open_parquet(path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("parquet output needs pyarrow: pip install pyarrow")
+    return ParquetFile(pa, pq, path)
+
+
+class ParquetFile:
+    """
+    Row-group-at-a-time writer for (department, code, verdict, issues, course)
+    rows, with the course kept as its JSON text.
+    """
+
+    def __init__(self, pa, pq, path):
+        self.pa = pa
+        self.schema = pa.schema([(column, pa.string()) for column in PARQUET_COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows):
+        columns = [list(values) for values in zip(*rows)]
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,94 @@
+import re
+import sys
+from pathlib import Path
+
+# coursescraper lives in the sibling scraper project
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scraper"))
+
+# the same segments and codes as the parser, and the same test score and
+# level rules as the structural checks
+from coursescraper.restrictions import RestrictionParser  # noqa: E402
+from coursescraper.structure import TEST_SCORE, level_jumps  # noqa: E402
+
+# the scraper reads any run of 3+ digits as (part of) a course number
+DIGITS = re.compile(r"\d{3,}")
+# "Prerequisite", "Coreqs", ... with or without the colon the parser needs
+KEYWORD = re.compile(r"\b(?:pre|co)-?req(?:uisite)?s?\b", re.IGNORECASE)
+PARSER = RestrictionParser()
+
+
+def segments(text, restriction_parser):
+    """
+    [(start, end, field)] of the parser's prerequisite and corequisite
+    segments, field being "prerequisites" or "corequisites".
+    """
+    return [
+        (
+            match.start(),
+            match.end(),
+            "prerequisites" if match.group(1) is not None else "corequisites",
+        )
+        for match in restriction_parser.segment_pattern.finditer(text)
+    ]
+
+
+def check(course, restriction_parser=PARSER):
+    """
+    Cheap rule-based verdict for a course with restrictions_text, read with
+    the school adapter's restriction parser.
+
+    Returns ("approved", None) when the parsed arrays are plainly a faithful
+    translation (the DEPT NNN codes of each prerequisite segment are exactly
+    the prerequisites, those of each corequisite segment exactly the
+    corequisites, and there are no bare numbers or keywords the segments
+    missed), ("flagged", issues) for the known traps, and (None, None) when
+    the course needs the model.
+    """
+    text = restriction_parser.normalize(course.get("restrictions_text") or "")
+    prerequisites = course.get("prerequisites") or []
+    corequisites = course.get("corequisites") or []
+    parsed = prerequisites + corequisites
+
+    spans = segments(text, restriction_parser)
+    # codes per segment field, None for codes outside every segment
+    explicit_by_field = {"prerequisites": set(), "corequisites": set(), None: set()}
+    explicit_spans = []
+    for code, span in restriction_parser.explicit_codes(text):
+        field = next(
+            (field for start, end, field in spans if start <= span[0] < end), None
+        )
+        explicit_by_field[field].add(code)
+        explicit_spans.append(span)
+    explicit = set().union(*explicit_by_field.values())
+
+    bare_numbers = [
+        match.group()
+        for match in DIGITS.finditer(text)
+        if not any(start <= match.start() < end for start, end in explicit_spans)
+    ]
+    inferred = [code for code in parsed if code not in explicit]
+
+    issues = []
+    if inferred and bare_numbers and TEST_SCORE.search(text):
+        issues.append(
+            "test score likely parsed as a course number: " + ", ".join(inferred)
+        )
+
+    for code, level in level_jumps(course.get("code"), prerequisites):
+        issues.append(
+            f"graduate-level jump: {code} required for a {level}00-level course"
+        )
+
+    if issues:
+        return "flagged", "prefilter: " + "; ".join(issues)
+    if (
+        not bare_numbers
+        and not inferred
+        # "..., Corequisite MA 141" without a colon stays in the segment before
+        and len(KEYWORD.findall(text)) <= len(spans)
+        and not explicit_by_field[None]
+        and explicit_by_field["prerequisites"] == set(prerequisites)
+        and explicit_by_field["corequisites"] == set(corequisites)
+    ):
+        return "approved", None
+    return None, None
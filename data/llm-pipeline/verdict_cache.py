@@ -0,0 +1,105 @@
+import hashlib
+import json
+import sqlite3
+import time
+from threading import Lock
+
+# the only course fields the verdict depends on; the code matters for the
+# graduate-level check
+CACHED_FIELDS = (
+    "code",
+    "restrictions_text",
+    "prerequisites",
+    "corequisites",
+    "other_restrictions",
+)
+
+
+class VerdictCache:
+    """
+    Persistent model verdicts keyed by a hash of the model name, the prompt
+    (single-course or batch) and its template version, and the course fields
+    the prompt is about. Courses whose
+    restrictions didn't change since the last crawl never reach the model.
+
+    Entries older than max_age_days are dropped, and past max_entries the
+    least recently used ones go first.
+    """
+
+    def __init__(self, path, max_age_days=180, max_entries=200_000):
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                key TEXT PRIMARY KEY,
+                verdict TEXT NOT NULL,
+                issues TEXT,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS verdicts_used_at ON verdicts (used_at)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def key(model, prompt_version, course, prompt="single"):
+        fields = {field: course.get(field) for field in CACHED_FIELDS}
+        payload = json.dumps(
+            [model, prompt, prompt_version, fields], sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Returns (verdict, issues) or None.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT verdict, issues FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    "UPDATE verdicts SET used_at = ? WHERE key = ?", (time.time(), key)
+                )
+                self.connection.commit()
+        return row
+
+    def put(self, key, verdict, issues=None):
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (key, verdict, issues, now, now),
+            )
+            self.connection.commit()
+
+    def evict(self):
+        """
+        Applies the age and size limits and returns how many entries went.
+        """
+        with self.lock:
+            removed = self.connection.execute(
+                "DELETE FROM verdicts WHERE created_at < ?",
+                (time.time() - self.max_age,),
+            ).rowcount
+            removed += self.connection.execute(
+                """
+                DELETE FROM verdicts WHERE key IN (
+                    SELECT key FROM verdicts ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+            self.connection.commit()
+        return removed
+
+    def close(self):
+        self.connection.close()
@@ -2,16 +2,15 @@ import * as courseMeetingsJSON from "../../scraper/meetingscraper/course_times.j
 import fs from "fs";
 
 function formatSection(section) {
+  // days/time sit under section.meeting since the scraper's typed items
+  const { days: shownDays, time } = section.meeting ?? section;
+
   // skip recitations and async/TBD
-  if (
-    !section.days ||
-    section.time === "TBD" ||
-    /\d{3}[A-Z]/.test(section.section)
-  )
+  if (!shownDays || time === "TBD" || /\d{3}[A-Z]/.test(section.section))
     return null;
 
-  const days = section.days === "TT" ? "TTh" : section.days;
-  return `${section.section} ${days}${convertTimeToMilitary(section.time)}`;
+  const days = shownDays === "TT" ? "TTh" : shownDays;
+  return `${section.section} ${days}${convertTimeToMilitary(time)}`;
 }
 
 function convertTimeToMilitary(timeStr) {
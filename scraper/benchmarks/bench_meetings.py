@@ -0,0 +1,152 @@
+"""
+Meeting time parse throughput on saved search.php responses.
+
+    cd scraper
+    python -m benchmarks.bench_meetings responses/          # saved JSON bodies
+    python -m benchmarks.bench_meetings --pagecache meetingscraper/.scrapy/pagecache
+
+Replays every response through the old scrapy.Selector parse and through
+parse_sections, checks the items match, and prints responses/sec for each.
+Inputs are .json files (or directories of them) holding search.php bodies,
+or the meeting spider's page cache, optionally limited to --partition terms.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from parsel import Selector
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "meetingscraper"))
+
+from meetingscraper.sections import parse_sections  # noqa: E402
+
+
+def legacy_parse(text):
+    # MeetingSpider.parse as it was before parse_sections, kept as the baseline
+    sel = Selector(text=text)
+    courses = []
+    for course in sel.css("section.course"):
+        course_id = course.attrib["id"]
+        sections = []
+        for row in course.css(
+            "table.section-table tr:not(:first-child):not(:last-child)"
+        ):
+            days = [
+                d.css("abbr::text").get()[0] for d in row.css(".weekdisplay li.meet")
+            ]
+
+            sections.append(
+                {
+                    "section": row.css("td:nth-child(1)::text").get("").strip(),
+                    "type": row.css("td:nth-child(2)::text").get("").strip(),
+                    "days": "".join(days),
+                    "time": row.css("td:nth-child(5)::text").getall()[-1].strip(),
+                    "location": row.css("td:nth-child(6)::text").get("").strip(),
+                }
+            )
+
+        if sections:
+            courses.append((course_id, sections))
+    return courses
+
+
+def legacy_fields(section):
+    # the baseline's dict, without the integer meeting times
+    return {
+        "section": section.section,
+        "type": section.type,
+        "days": section.meeting.days,
+        "time": section.meeting.time,
+        "location": section.location,
+    }
+
+
+def current_parse(text):
+    return [
+        (course_id, [legacy_fields(section) for section in sections])
+        for course_id, sections in parse_sections(text)
+        if sections
+    ]
+
+
+def decode(body, encoding):
+    # the page cache keeps bodies as they came off the wire
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    if encoding:
+        raise SystemExit(f"unsupported Content-Encoding {encoding!r}")
+    return body
+
+
+def load_files(paths):
+    bodies = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        bodies.extend(file.read_bytes() for file in files)
+    return bodies
+
+
+def load_pagecache(cache_dir, partitions):
+    from coursescraper.pagecache import PageCacheStorage, first_header
+
+    storage = PageCacheStorage(cache_dir)
+    bodies = []
+    for partition, entry in storage.iter_entries():
+        if partitions and partition not in partitions:
+            continue
+        body = storage.load_body(entry)
+        if body is not None:
+            encoding = first_header(entry["headers"], "Content-Encoding")
+            bodies.append(decode(body, encoding))
+    return bodies
+
+
+def run(parse, inputs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(text) for text in inputs]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="*", help="saved responses or directories")
+    parser.add_argument("--pagecache", help="meeting spider PAGECACHE_DIR")
+    parser.add_argument("--partition", action="append", default=[], help="term")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = load_files(args.inputs)
+    if args.pagecache:
+        bodies.extend(load_pagecache(args.pagecache, args.partition))
+    inputs = [json.loads(body)["html"] for body in bodies]
+    if not inputs:
+        raise SystemExit("no search.php responses to replay")
+
+    before, before_time = run(legacy_parse, inputs, args.repeat)
+    after, after_time = run(current_parse, inputs, args.repeat)
+
+    mismatches = sum(1 for old, new in zip(before, after) if old != new)
+    sections = sum(len(rows) for courses in after for _, rows in courses)
+
+    print(f"{len(inputs)} responses, {sections} sections")
+    print(f"before: {len(inputs) / before_time:,.1f} responses/sec")
+    print(f"after:  {len(inputs) / after_time:,.1f} responses/sec")
+    print(f"speedup: {before_time / after_time:.2f}x")
+    print(f"mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Restriction parser throughput on a saved catalog dump.
+
+    cd scraper
+    scrapy crawl coursespider -o ncsu_courses.json
+    python -m benchmarks.bench_restrictions ncsu_courses.json
+
+Runs the old per-item regex parser and RestrictionParser over every course
+with restrictions, checks the outputs match, and prints items/sec for each.
+"""
+
+import argparse
+import re
+import time
+
+from coursescraper.catalog import iter_courses
+from coursescraper.restrictions import RestrictionParser
+
+
+def legacy_parse_restrictions(text, primary_department):
+    # the parser as it was before RestrictionParser, kept as the baseline
+    prerequisites = []
+    corequisites = []
+    other_restrictions = []
+
+    text = text.replace("Prerequisite", "Prerequisite")
+    text = text.replace("prerequisite", "Prerequisite")
+    text = text.replace("Corequisite", "Corequisite")
+    text = text.replace("corequisite", "Corequisite")
+    text = text.replace("Co-requisite", "Corequisite")
+    text = text.replace("co-requisite", "Corequisite")
+    text = text.replace("Restricition", "Restriction")
+
+    prereq_pattern = r"[Pp](?:rereq(?:uisite)?s?)?:\s*([^;:\n]+)"
+    coreq_pattern = r"[Cc](?:oreq(?:uisite)?s?)?:\s*([^;:\n]+)"
+    other_pattern = (
+        r"(?![Pp](?:rereq(?:uisite)?s?)?|[Cc](?:oreq(?:uisite)?s?)?:)"  # no keyword
+        r"([^;:\n]+)"
+    )
+
+    for match in re.findall(prereq_pattern, text, re.IGNORECASE):
+        prerequisites.append(match.strip())
+    for match in re.findall(coreq_pattern, text, re.IGNORECASE):
+        corequisites.append(match.strip())
+
+    text_cleaned = re.sub(prereq_pattern, "", text, flags=re.IGNORECASE)
+    text_cleaned = re.sub(coreq_pattern, "", text_cleaned, flags=re.IGNORECASE)
+    for match in re.findall(other_pattern, text_cleaned, re.IGNORECASE):
+        if match.strip():
+            other_restrictions.append(match.strip())
+
+    prerequisites = legacy_extract_course_codes(prerequisites, primary_department)
+    corequisites = legacy_extract_course_codes(corequisites, primary_department)
+    other_restrictions = [res.strip() for res in other_restrictions if res.strip()]
+
+    return {
+        "prerequisites": prerequisites if prerequisites else None,
+        "corequisites": corequisites if corequisites else None,
+        "other_restrictions": other_restrictions if other_restrictions else None,
+    }
+
+
+def legacy_extract_course_codes(texts, primary_department):
+    course_codes = []
+    pattern = r"([A-Z]{1,4})\s*(\d{3})|(\d{3})"
+
+    for text in texts:
+        current_dept = None
+        for dept, number, number_only in re.findall(pattern, text):
+            if dept and number:
+                current_dept = dept.upper()
+                course_codes.append(f"{current_dept}{number}")
+            elif number_only:
+                if current_dept:
+                    course_codes.append(f"{current_dept}{number_only}")
+                elif primary_department:
+                    course_codes.append(f"{primary_department}{number_only}")
+
+    return course_codes if course_codes else None
+
+
+def load_restrictions(path):
+    return [
+        (course["restrictions_text"], course.get("department"))
+        for course in iter_courses(path)
+        if course.get("restrictions_text")
+    ]
+
+
+def run(parse, inputs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(text, department) for text, department in inputs]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("catalog", help="coursespider export (.json or .jsonl)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = load_restrictions(args.catalog)
+    if not inputs:
+        raise SystemExit(f"no restrictions_text found in {args.catalog}")
+
+    restriction_parser = RestrictionParser()
+    before, before_time = run(legacy_parse_restrictions, inputs, args.repeat)
+    after, after_time = run(restriction_parser.parse, inputs, args.repeat)
+
+    mismatches = sum(1 for old, new in zip(before, after) if old != new)
+    fallbacks = sum(
+        1
+        for text, department in inputs
+        if restriction_parser.parse_single_pass(
+            restriction_parser.normalize(text), department
+        )
+        is None
+    )
+
+    print(f"{len(inputs)} courses with restrictions")
+    print(f"before: {len(inputs) / before_time:,.0f} items/sec")
+    print(f"after:  {len(inputs) / after_time:,.0f} items/sec")
+    print(f"speedup: {before_time / after_time:.2f}x")
+    print(f"multipass fallbacks: {fallbacks}")
+    print(f"mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
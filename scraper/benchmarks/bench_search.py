@@ -0,0 +1,143 @@
+"""
+Typeahead latency of the search index on a saved catalog dump.
+
+    cd scraper
+    scrapy crawl coursespider -o ncsu_courses.json
+    python -m benchmarks.bench_search ncsu_courses.json
+
+Builds the index, writes and reloads it, then times a query set drawn from
+the catalog (code prefixes, full codes, name word prefixes, misspelled name
+words) against the client's filter over /courses/basic, a lowercase
+substring match on every code and name. Prints mean and p99 per query kind
+and how many full codes came back first.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from coursescraper.catalog import iter_courses
+from coursescraper.search import SearchIndex, words
+
+
+def substring_filter(courses, query):
+    # ClientSearch.tsx, kept as the baseline
+    q = query.lower()
+    return [
+        course
+        for course in courses
+        if q in course["code"].lower() or q in course["name"].lower()
+    ]
+
+
+def misspell(word, rng):
+    # swap two neighbouring letters
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+def make_queries(courses, count, seed):
+    rng = random.Random(seed)
+    name_words = [word for course in courses for word in words(course["name"])]
+    long_words = [word for word in name_words if len(word) >= 5]
+    queries = {"code prefix": [], "code": [], "word prefix": [], "typo": []}
+    for _ in range(count):
+        code = rng.choice(courses)["code"]
+        letters = code.rstrip("0123456789")
+        queries["code prefix"].append(f"{letters.lower()} {code[len(letters)]}")
+        queries["code"].append(code)
+        word = rng.choice(name_words)
+        queries["word prefix"].append(word[: rng.randint(3, max(3, len(word)))])
+        if long_words:
+            queries["typo"].append(misspell(rng.choice(long_words), rng))
+    return queries
+
+
+def timed(search, queries, repeat):
+    # best of repeat for each query, in milliseconds
+    times = []
+    for query in queries:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search(query)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best * 1e3)
+    return times
+
+
+def p99(times):
+    return sorted(times)[min(len(times) - 1, int(len(times) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("catalog", help="coursespider export (.json or .jsonl)")
+    parser.add_argument("--queries", type=int, default=200, help="per query kind")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    courses = [course for course in iter_courses(args.catalog) if course.get("code")]
+    if not courses:
+        raise SystemExit(f"no courses found in {args.catalog}")
+    for course in courses:
+        course["name"] = course.get("name") or ""
+
+    start = time.perf_counter()
+    index = SearchIndex.build(courses)
+    built = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "course_search.idx")
+        index.write(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        index = SearchIndex.load(path)
+        loaded = time.perf_counter() - start
+
+    basic = json.dumps(
+        [{"code": course["code"], "name": course["name"]} for course in courses]
+    )
+    print(f"{len(index.codes)} courses, {len(index.terms)} words")
+    print(f"build: {built:.2f}s, load: {loaded * 1e3:.1f}ms")
+    print(f"index: {size / 1e6:.2f} MB, /courses/basic: {len(basic) / 1e6:.2f} MB")
+
+    queries = make_queries(courses, args.queries, args.seed)
+    print(f"{'':12}  {'before mean/p99 ms':>20}  {'after mean/p99 ms':>20}  speedup")
+    before_total = after_total = 0
+    for kind, kind_queries in queries.items():
+        if not kind_queries:
+            continue
+        before = timed(
+            lambda query: substring_filter(courses, query), kind_queries, args.repeat
+        )
+        after = timed(
+            lambda query: index.search(query, args.limit), kind_queries, args.repeat
+        )
+        before_total += sum(before)
+        after_total += sum(after)
+        print(
+            f"{kind:12}  "
+            f"{statistics.mean(before):>11.3f} / {p99(before):<6.3f}  "
+            f"{statistics.mean(after):>11.3f} / {p99(after):<6.3f}  "
+            f"{sum(before) / sum(after):.1f}x"
+        )
+    print(f"speedup: {before_total / after_total:.1f}x")
+
+    exact = sum(
+        1
+        for code in queries["code"]
+        if [found for found, _, _ in index.search(code, 1)] == [code]
+    )
+    print(f"full codes ranked first: {exact}/{len(queries['code'])}")
+
+
+if __name__ == "__main__":
+    main()
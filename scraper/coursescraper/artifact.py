@@ -0,0 +1,231 @@
+"""
+Precomputed dependency artifact for the API.
+
+One file holds everything the server's course endpoints need per course:
+the course info, direct and transitive requirements, what it unlocks and who
+teaches it. The server reads it once at startup instead of warming its caches
+one Neo4j query at a time.
+
+    cd scraper
+    python -m coursescraper.artifact build ncsu_courses.json -o dependencies.bin \\
+        --professors ../data/professor-pipeline/validProfessors.json
+    python -m coursescraper.artifact get dependencies.bin CSC316
+
+Layout (little endian):
+    magic       8 bytes, MAGIC
+    header_len  u32
+    header      JSON: format, version (sha256 of the data section), built_at,
+                courses, code_width
+    index       `courses` fixed-size records sorted by code:
+                code (NUL padded to code_width), offset u64, length u32
+    data        one UTF-8 JSON document per course, offsets relative to here
+
+The index is fixed-width so a reader can mmap the file and binary search it
+without parsing anything else.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+from coursescraper.catalog import iter_courses
+from coursescraper.graph import COREQ, PREREQ, PrereqGraph, normalize_code
+
+MAGIC = b"SYLBART1"
+FORMAT = 1
+CODE_WIDTH = 16
+RECORD = struct.Struct(f"<{CODE_WIDTH}sQI")
+HEADER_LENGTH = struct.Struct("<I")
+
+# professor fields worth shipping with a course
+PROFESSOR_FIELDS = (
+    "id",
+    "name",
+    "department",
+    "avgRating",
+    "avgDifficulty",
+    "numRatings",
+    "wouldTakeAgainPercent",
+)
+
+
+def professors_by_course(professors):
+    courses = {}
+    for professor in professors:
+        summary = {field: professor.get(field) for field in PROFESSOR_FIELDS}
+        for code in professor.get("courses") or []:
+            courses.setdefault(normalize_code(code), []).append(summary)
+    return courses
+
+
+def course_entries(courses, professors=None):
+    """
+    Yields (code, entry) for every catalog course, sorted by code.
+    """
+    # cross-listed courses keep their first listing, as the graph does
+    by_code = {}
+    for course in courses:
+        by_code.setdefault(course["code"], course)
+    courses = by_code
+    graph = PrereqGraph.from_courses(courses.values())
+    teaching = professors_by_course(professors or [])
+
+    for code in sorted(courses):
+        course = courses[code]
+        node = graph.node(code)
+        yield code, {
+            # same shape as the Course node properties the server returns
+            "info": {
+                "code": code,
+                "name": course.get("name"),
+                "hours": course.get("hours"),
+                "description": course.get("description"),
+                "restrictions": course.get("restrictions_text") or "",
+                "department": course.get("department"),
+            },
+            # the server's dependencies query only matches catalog courses
+            "dependencies": sorted(
+                {
+                    requirement
+                    for requirement in graph.direct(code)
+                    if graph.known[graph.index[requirement]]
+                }
+            ),
+            "prerequisites": graph.direct(code, PREREQ),
+            "corequisites": graph.direct(code, COREQ),
+            "transitive": graph.prerequisites(code),
+            "depth": graph.depth(code),
+            "required_by": sorted(
+                graph.codes[source] for source in graph.predecessors(node)
+            ),
+            "unlocks": graph.unlocks(code),
+            "professors": teaching.get(normalize_code(code), []),
+        }
+
+
+def write_artifact(path, entries):
+    """
+    Writes (code, entry) pairs, sorted by code, to path atomically and
+    returns the header.
+    """
+    index = []
+    data = bytearray()
+    for code, entry in entries:
+        encoded = code.encode("ascii")
+        if len(encoded) > CODE_WIDTH:
+            raise ValueError(f"course code {code!r} is over {CODE_WIDTH} bytes")
+        document = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+        index.append(RECORD.pack(encoded, len(data), len(document)))
+        data += document
+
+    header = {
+        "format": FORMAT,
+        "version": hashlib.sha256(data).hexdigest(),
+        "built_at": int(time.time()),
+        "courses": len(index),
+        "code_width": CODE_WIDTH,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"".join(index))
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+    return header
+
+
+class Artifact:
+    """
+    Read side: mmaps the file and binary searches the index per lookup.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a dependency artifact")
+        (header_length,) = HEADER_LENGTH.unpack_from(self.buffer, len(MAGIC))
+        start = len(MAGIC) + HEADER_LENGTH.size
+        self.header = json.loads(self.buffer[start : start + header_length])
+        if self.header["format"] != FORMAT:
+            raise ValueError(f"unsupported artifact format {self.header['format']}")
+        self.index_start = start + header_length
+        self.count = self.header["courses"]
+        self.data_start = self.index_start + self.count * RECORD.size
+
+    def record(self, position):
+        code, offset, length = RECORD.unpack_from(
+            self.buffer, self.index_start + position * RECORD.size
+        )
+        return code.rstrip(b"\0"), offset, length
+
+    def get(self, code):
+        """
+        The entry for `code`, or None.
+        """
+        key = normalize_code(code).encode("ascii")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found, offset, length = self.record(middle)
+            if found == key:
+                start = self.data_start + offset
+                return json.loads(self.buffer[start : start + length])
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def codes(self):
+        return [self.record(i)[0].decode("ascii") for i in range(self.count)]
+
+    def close(self):
+        self.buffer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or read the API artifact.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="precompute from a crawl export")
+    build.add_argument("input", help="coursespider export, JSON array or JSON Lines")
+    build.add_argument("-o", "--output", default="dependencies.bin")
+    build.add_argument("--professors", help="professor JSON with a courses list each")
+    get = commands.add_parser("get", help="print one course's entry")
+    get.add_argument("artifact")
+    get.add_argument("code")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        professors = None
+        if args.professors:
+            with open(args.professors, "r", encoding="utf-8") as f:
+                professors = json.load(f)
+        start = time.perf_counter()
+        header = write_artifact(
+            args.output, course_entries(iter_courses(args.input), professors)
+        )
+        print(
+            f"wrote {header['courses']} courses to {args.output} "
+            f"(version {header['version'][:12]}, "
+            f"{os.path.getsize(args.output):,} bytes) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+    else:
+        artifact = Artifact(args.artifact)
+        print(json.dumps(artifact.get(args.code), indent=2))
+        artifact.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Reading and writing coursespider exports.
+
+Exports are either a JSON array (`scrapy crawl coursespider -o ncsu_courses.json`)
+or JSON Lines (`-o ncsu_courses.jsonl`); the format is picked by extension.
+Arrays are parsed incrementally so a large catalog never has to be held in
+memory as one string.
+
+dumps() serializes dicts and the dataclass items with orjson when it is
+installed and the json module otherwise.
+"""
+
+import dataclasses
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = re.compile(r"\s*")
+SEPARATORS = ",] \t\r\n"
+
+
+def to_builtin(value):
+    # dataclass items for the json module, scrapy.Item and friends for both
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    from itemadapter import ItemAdapter
+
+    return ItemAdapter(value).asdict()
+
+
+def dumps(value):
+    """
+    Compact UTF-8 JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=to_builtin)
+    return json.dumps(
+        value, default=to_builtin, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def is_json_lines(path):
+    return path.endswith((".jsonl", ".jl"))
+
+
+def iter_courses(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if is_json_lines(path):
+            loads = orjson.loads if orjson is not None else json.loads
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        else:
+            yield from iter_json_array(f)
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """
+    Yields the elements of a top-level JSON array one at a time. Raises
+    ValueError on a missing comma or anything but whitespace after the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+    # "first" right after "[", "value" after a comma, "separator" after an
+    # element
+    expecting = "first"
+
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise ValueError("unterminated JSON array")
+            chunk = f.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            continue
+
+        char = buffer[position]
+        if not started:
+            if char != "[":
+                raise ValueError("expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if char == "]" and expecting != "value":
+            break
+        if expecting == "separator":
+            if char != ",":
+                raise ValueError(f"expected ',' or ']', got {char!r}")
+            expecting = "value"
+            position += 1
+            continue
+        if char in ",]":
+            raise ValueError(f"expected an array element, got {char!r}")
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = len(buffer)
+        if (end == len(buffer) or buffer[end] not in SEPARATORS) and not eof:
+            # the element (e.g. a number) may continue in the next chunk
+            chunk = f.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            continue
+
+        if end < len(buffer) and buffer[end] not in SEPARATORS:
+            raise ValueError(f"unexpected {buffer[end]!r} after array element")
+
+        yield value
+        position = end
+        expecting = "separator"
+
+    # only whitespace may follow the array
+    position += 1
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if position < len(buffer):
+            raise ValueError(f"unexpected {buffer[position]!r} after the JSON array")
+        if eof:
+            return
+        buffer, position = f.read(chunk_size), 0
+        eof = not buffer
+
+
+class CourseWriter:
+    """
+    Writes courses in the same layout scrapy's feed exporters use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.json_lines = is_json_lines(path)
+        self.count = 0
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "wb")
+        if not self.json_lines:
+            self.file.write(b"[")
+        return self
+
+    def write(self, course):
+        line = dumps(course)
+        if self.json_lines:
+            self.file.write(line + b"\n")
+        else:
+            self.file.write((b"\n" if self.count == 0 else b",\n") + line)
+        self.count += 1
+
+    def __exit__(self, *exc_info):
+        if not self.json_lines:
+            self.file.write(b"\n]")
+        self.file.close()
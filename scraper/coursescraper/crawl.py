@@ -0,0 +1,63 @@
+"""
+Crawl several schools' catalogs in one process.
+
+    cd scraper
+    python -m coursescraper.crawl ncsu --profile fast --output-dir exports
+
+Each school runs as its own coursespider crawler in a shared CrawlerProcess,
+so they download concurrently but keep separate downloaders, stats and
+pipelines. Every school writes <output-dir>/<school>_courses.jsonl and keeps
+its own delta manifest and search index, and gets a download slot per catalog
+host sized by the crawl profile's catalog slot.
+"""
+
+import argparse
+from pathlib import Path
+
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from coursescraper.profiles import CATALOG_HOST, PROFILES
+from coursescraper.schools import SCHOOLS, get_school
+from coursescraper.spiders.coursespider import CoursespiderSpider
+
+
+def school_settings(base, school, profile, output_dir):
+    settings = base.copy()
+    output_dir = Path(output_dir)
+    overrides = {
+        "CRAWL_PROFILE": profile,
+        "FEEDS": {
+            str(output_dir / f"{school.name}_courses.jsonl"): {"format": "jsonlines"}
+        },
+        "COURSE_MANIFEST": str(output_dir / f"{school.name}_course_manifest.json"),
+        "COURSE_DELTA": str(output_dir / f"{school.name}_course_delta.jsonl"),
+        "SEARCH_INDEX": str(output_dir / f"{school.name}_course_search.idx"),
+    }
+    slot = PROFILES[profile].get("DOWNLOAD_SLOTS", {}).get(CATALOG_HOST)
+    if slot:
+        overrides["DOWNLOAD_SLOTS"] = {host: slot for host in school.allowed_domains}
+    # cmdline priority so the profile applied in update_settings doesn't win
+    settings.setdict(overrides, priority="cmdline")
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl several school catalogs.")
+    parser.add_argument("schools", nargs="+", choices=sorted(SCHOOLS))
+    parser.add_argument("--profile", default="polite", choices=sorted(PROFILES))
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args()
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    base = get_project_settings()
+    process = CrawlerProcess(base)
+    for name in dict.fromkeys(args.schools):
+        school = get_school(name)
+        settings = school_settings(base, school, args.profile, args.output_dir)
+        process.crawl(Crawler(CoursespiderSpider, settings), school=name)
+    process.start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Batched eligibility over the whole catalog from prerequisite trees.
+
+Every distinct leaf (course + minimum grade, class standing, or permission)
+becomes an "atom" bit. Each course's tree is flattened into CNF, an AND of
+clauses where each clause is an OR of atoms, i.e. one atom bitmask per
+clause. Clauses are deduplicated across the catalog and each one remembers,
+as a bitset over course ids, which courses need it.
+
+A student is then a single atom bitmask: a course is blocked exactly when
+one of its clauses shares no bit with the student, so
+
+    blocked = OR of courses_needing[clause] for every unsatisfied clause
+    eligible = all courses & ~blocked
+
+which is one AND per distinct clause however many courses there are.
+
+Permission ("or permission of instructor") is never assumed: courses that
+only open up with it are reported separately by with_permission().
+
+    cd scraper
+    python -m coursescraper.eligibility ncsu_courses.json CSC116 MA141:B \\
+        --standing sophomore --school ncsu
+"""
+
+import argparse
+import time
+
+from coursescraper.catalog import iter_courses
+from coursescraper.graph import iter_bits, normalize_code
+from coursescraper.requirements import leaves
+from coursescraper.schools import SCHOOLS, get_school
+
+GRADES = ("D-", "D", "D+", "C-", "C", "C+", "B-", "B", "B+", "A-", "A", "A+")
+GRADE_RANK = {grade: rank for rank, grade in enumerate(GRADES)}
+STANDINGS = ("freshman", "sophomore", "junior", "senior", "graduate")
+
+# trees whose CNF would grow past this many clauses are evaluated directly
+MAX_CLAUSES = 64
+
+
+def cnf(tree):
+    """
+    List of clauses (frozensets of leaf keys), or None past MAX_CLAUSES.
+    """
+    if "op" not in tree:
+        return [frozenset([leaf_key(tree)])]
+    parts = [cnf(arg) for arg in tree["args"]]
+    if any(part is None for part in parts):
+        return None
+    if tree["op"] == "and":
+        clauses = [clause for part in parts for clause in part]
+    else:
+        clauses = [frozenset()]
+        for part in parts:
+            clauses = [clause | other for clause in clauses for other in part]
+            if len(clauses) > MAX_CLAUSES:
+                return None
+    return clauses if len(clauses) <= MAX_CLAUSES else None
+
+
+def leaf_key(leaf):
+    if "permission" in leaf:
+        return ("permission",)
+    if "standing" in leaf:
+        return ("standing", leaf["standing"])
+    return ("course", leaf["course"], leaf.get("grade"))
+
+
+def meets(grade, minimum):
+    # a completed course without a recorded grade counts as passed
+    if minimum is None or grade is None:
+        return True
+    return GRADE_RANK.get(grade, -1) >= GRADE_RANK.get(minimum, 0)
+
+
+class EligibilityIndex:
+    def __init__(self, courses):
+        """
+        courses: dicts with "code" and "prerequisite_tree" (as written by the
+        pipeline); courses without a tree have no requirements.
+        """
+        self.codes = []
+        self.atoms = {}
+        self.atoms_by_course = {}
+        self.clauses = {}
+        self.fallback = []
+        self.all_courses = 0
+
+        for course in courses:
+            course_id = len(self.codes)
+            self.codes.append(normalize_code(course["code"]))
+            self.all_courses |= 1 << course_id
+
+            tree = course.get("prerequisite_tree")
+            if not tree:
+                continue
+            clauses = cnf(tree)
+            if clauses is None:
+                for leaf in leaves(tree):
+                    self.atom(leaf_key(leaf))
+                self.fallback.append((course_id, tree))
+                continue
+            for clause in clauses:
+                mask = 0
+                for key in clause:
+                    mask |= 1 << self.atom(key)
+                self.clauses[mask] = self.clauses.get(mask, 0) | 1 << course_id
+
+        self.clause_items = list(self.clauses.items())
+
+    def atom(self, key):
+        if key not in self.atoms:
+            self.atoms[key] = len(self.atoms)
+            if key[0] == "course":
+                self.atoms_by_course.setdefault(key[1], []).append(key)
+        return self.atoms[key]
+
+    def student_mask(self, completed, standing=None, permission=False):
+        """
+        completed: {code: grade or None}, or just an iterable of codes.
+        permission: count "permission of instructor" alternatives as met.
+        """
+        if not isinstance(completed, dict):
+            completed = dict.fromkeys(completed)
+        mask = 0
+        for code, grade in completed.items():
+            for key in self.atoms_by_course.get(normalize_code(code), ()):
+                if meets(grade, key[2]):
+                    mask |= 1 << self.atoms[key]
+        if permission and ("permission",) in self.atoms:
+            mask |= 1 << self.atoms[("permission",)]
+        if standing:
+            rank = STANDINGS.index(standing.lower())
+            for level in STANDINGS[: rank + 1]:
+                key = ("standing", level)
+                if key in self.atoms:
+                    mask |= 1 << self.atoms[key]
+        return mask
+
+    def eligible_bits(self, student):
+        blocked = 0
+        for mask, courses in self.clause_items:
+            if not student & mask:
+                blocked |= courses
+        eligible = self.all_courses & ~blocked
+        for course_id, tree in self.fallback:
+            if not self.satisfied(tree, student):
+                eligible &= ~(1 << course_id)
+        return eligible
+
+    def satisfied(self, tree, student):
+        if "op" in tree:
+            results = (self.satisfied(arg, student) for arg in tree["args"])
+            return all(results) if tree["op"] == "and" else any(results)
+        return bool(student >> self.atoms[leaf_key(tree)] & 1)
+
+    def eligible(self, completed, standing=None):
+        """
+        Sorted codes of every course whose prerequisites are met.
+        """
+        bits = self.eligible_bits(self.student_mask(completed, standing))
+        return sorted(self.codes[course_id] for course_id in iter_bits(bits))
+
+    def with_permission(self, completed, standing=None):
+        """
+        Sorted codes of every course the student could only take with the
+        instructor's (or department's) permission.
+        """
+        without = self.eligible_bits(self.student_mask(completed, standing))
+        bits = self.eligible_bits(self.student_mask(completed, standing, True))
+        return sorted(self.codes[course_id] for course_id in iter_bits(bits & ~without))
+
+    def eligible_many(self, transcripts):
+        """
+        eligible() for a batch of (completed, standing) pairs.
+        """
+        return [
+            self.eligible(completed, standing) for completed, standing in transcripts
+        ]
+
+
+def with_trees(courses, requirement_parser):
+    """
+    Adds prerequisite_tree to exports crawled before the pipeline wrote it,
+    with the school adapter's requirement parser.
+    """
+    for course in courses:
+        if "prerequisite_tree" not in course and course.get("restrictions_text"):
+            course["prerequisite_tree"] = requirement_parser.parse(
+                course["restrictions_text"], course.get("department")
+            )
+        yield course
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Courses a student can take.")
+    parser.add_argument("input", help="coursespider export, JSON array or JSON Lines")
+    parser.add_argument("completed", nargs="*", help="CODE or CODE:GRADE, e.g. MA141:B")
+    parser.add_argument("--standing", choices=STANDINGS)
+    parser.add_argument(
+        "--school", default="ncsu", choices=sorted(SCHOOLS), help="code format"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    requirement_parser = get_school(args.school).requirement_parser
+    index = EligibilityIndex(with_trees(iter_courses(args.input), requirement_parser))
+    print(
+        f"{len(index.codes)} courses, {len(index.clauses)} distinct clauses, "
+        f"{len(index.atoms)} atoms in {time.perf_counter() - start:.2f}s"
+    )
+
+    completed = {}
+    for entry in args.completed:
+        code, _, grade = entry.partition(":")
+        completed[code] = grade.upper() or None
+
+    start = time.perf_counter()
+    eligible = index.eligible(completed, args.standing)
+    elapsed = time.perf_counter() - start
+    print(" ".join(eligible))
+    print(f"{len(eligible)} eligible, query took {elapsed * 1e3:.2f}ms")
+    with_permission = index.with_permission(completed, args.standing)
+    if with_permission:
+        print(f"with permission: {' '.join(with_permission)}")
+
+
+if __name__ == "__main__":
+    main()
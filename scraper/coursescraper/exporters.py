@@ -0,0 +1,43 @@
+"""
+Feed exporters that write items with catalog.dumps (orjson when installed).
+
+    FEED_EXPORTERS = {
+        "json": "coursescraper.exporters.JsonItemExporter",
+        "jsonlines": "coursescraper.exporters.JsonLinesItemExporter",
+    }
+
+The dataclass items (CourseItem, meetingscraper's CourseSections) go to
+orjson as they are, without the per-field ItemAdapter pass and JSONEncoder
+scrapy's own exporters make. Output is compact UTF-8 in the same array /
+one-object-per-line layout. FEED_EXPORT_FIELDS is not applied.
+"""
+
+from scrapy.exporters import BaseItemExporter
+
+from coursescraper.catalog import dumps
+
+
+class JsonLinesItemExporter(BaseItemExporter):
+    def __init__(self, file, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.file = file
+
+    def export_item(self, item):
+        self.file.write(dumps(item) + b"\n")
+
+
+class JsonItemExporter(BaseItemExporter):
+    def __init__(self, file, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.file = file
+        self.first_item = True
+
+    def start_exporting(self):
+        self.file.write(b"[")
+
+    def finish_exporting(self):
+        self.file.write(b"\n]")
+
+    def export_item(self, item):
+        self.file.write((b"\n" if self.first_item else b",\n") + dumps(item))
+        self.first_item = False
@@ -0,0 +1,376 @@
+"""
+In-process prerequisite graph built from a coursespider export.
+
+Course codes are mapped to integers and the "requires" edges (course ->
+prerequisite / corequisite) are stored as CSR arrays, forward and reverse.
+Strongly connected components are found once with Tarjan's algorithm, and
+the transitive closure of every course is precomputed over the component
+DAG as an integer bitset, so closure and "what does this unlock" queries are
+a bitset walk instead of a graph traversal.
+
+    cd scraper
+    python -m coursescraper.graph ncsu_courses.json deps CSC316
+    python -m coursescraper.graph ncsu_courses.json unlocks CSC116
+    python -m coursescraper.graph ncsu_courses.json path CSC316 CSC116
+    python -m coursescraper.graph ncsu_courses.json check
+"""
+
+import argparse
+import re
+import time
+from array import array
+from collections import deque
+
+from coursescraper.catalog import iter_courses
+
+PREREQ = 0
+COREQ = 1
+
+# spaces, dashes and the like between department and number
+CODE_SEPARATORS = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_code(code):
+    # "CSC 316", "csc-316" -> "CSC316"
+    return CODE_SEPARATORS.sub("", code.upper())
+
+
+def iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class PrereqGraph:
+    def __init__(self, codes, known, edges):
+        """
+        codes: node id -> course code; known: bytearray, 1 for courses that are
+        in the catalog (0 for codes only ever referenced); edges: (course,
+        requirement, kind) node id triples.
+        """
+        self.codes = codes
+        self.index = {code: node for node, code in enumerate(codes)}
+        self.known = known
+
+        edges = list(edges)
+        self.offsets, self.targets, self.kinds = self.build_csr(len(codes), edges)
+        self.reverse_offsets, self.reverse_targets, _ = self.build_csr(
+            len(codes), ((b, a, kind) for a, b, kind in edges)
+        )
+
+        self.components, self.component_of = self.strongly_connected_components()
+        self.reach, self.reverse_reach, self.depths = self.closure()
+
+    @classmethod
+    def from_courses(cls, courses, include_coreqs=True):
+        codes = []
+        index = {}
+        known = bytearray()
+        edges = set()
+
+        def node(code):
+            code = normalize_code(code)
+            if code not in index:
+                index[code] = len(codes)
+                codes.append(code)
+                known.append(0)
+            return index[code]
+
+        for course in courses:
+            source = node(course["code"])
+            known[source] = 1
+            requirements = [
+                (code, PREREQ) for code in course.get("prerequisites") or []
+            ]
+            if include_coreqs:
+                requirements += [
+                    (code, COREQ) for code in course.get("corequisites") or []
+                ]
+            for code, kind in requirements:
+                target = node(code)
+                if target != source:
+                    edges.add((source, target, kind))
+
+        return cls(codes, known, sorted(edges))
+
+    @staticmethod
+    def build_csr(size, edges):
+        edges = sorted(edges)
+        offsets = array("l", [0] * (size + 1))
+        targets = array("l")
+        kinds = array("b")
+        for source, target, kind in edges:
+            offsets[source + 1] += 1
+            targets.append(target)
+            kinds.append(kind)
+        for node in range(size):
+            offsets[node + 1] += offsets[node]
+        return offsets, targets, kinds
+
+    def successors(self, node):
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def predecessors(self, node):
+        return self.reverse_targets[
+            self.reverse_offsets[node] : self.reverse_offsets[node + 1]
+        ]
+
+    def strongly_connected_components(self):
+        """
+        Iterative Tarjan. Components come out in reverse topological order:
+        every component is emitted after all the components it requires.
+        """
+        size = len(self.codes)
+        order = [-1] * size
+        low = [0] * size
+        on_stack = bytearray(size)
+        stack = []
+        components = []
+        component_of = array("l", [-1] * size)
+        counter = 0
+
+        for root in range(size):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work.pop()
+                if position == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = 1
+                end = self.offsets[node + 1]
+                position += self.offsets[node]
+                recursed = False
+                while position < end:
+                    target = self.targets[position]
+                    position += 1
+                    if order[target] == -1:
+                        work.append((node, position - self.offsets[node]))
+                        work.append((target, 0))
+                        recursed = True
+                        break
+                    if on_stack[target]:
+                        low[node] = min(low[node], order[target])
+                if recursed:
+                    continue
+
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component_of[member] = len(components)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+        return components, component_of
+
+    def closure(self):
+        """
+        Per-component bitsets of everything required (reach) and everything
+        that requires it (reverse_reach), plus the longest requirement chain
+        below each component. Members of a cycle reach each other.
+        """
+        count = len(self.components)
+        members = [0] * count
+        for component, nodes in enumerate(self.components):
+            for node in nodes:
+                members[component] |= 1 << node
+
+        reach = [0] * count
+        depths = [0] * count
+        for component, nodes in enumerate(self.components):
+            bits = members[component] if len(nodes) > 1 else 0
+            depth = 0
+            for node in nodes:
+                for target in self.successors(node):
+                    other = self.component_of[target]
+                    if other != component:
+                        bits |= members[other] | reach[other]
+                        depth = max(depth, depths[other] + 1)
+            reach[component] = bits
+            depths[component] = depth
+
+        reverse_reach = [0] * count
+        for component in range(count - 1, -1, -1):
+            nodes = self.components[component]
+            bits = members[component] if len(nodes) > 1 else 0
+            for node in nodes:
+                for source in self.predecessors(node):
+                    other = self.component_of[source]
+                    if other != component:
+                        bits |= members[other] | reverse_reach[other]
+            reverse_reach[component] = bits
+
+        return reach, reverse_reach, depths
+
+    def node(self, code):
+        try:
+            return self.index[normalize_code(code)]
+        except KeyError:
+            raise KeyError(f"unknown course {code}") from None
+
+    def codes_of(self, bits, exclude=None):
+        return sorted(self.codes[node] for node in iter_bits(bits) if node != exclude)
+
+    def direct(self, code, kind=None):
+        node = self.node(code)
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return [
+            self.codes[self.targets[i]]
+            for i in range(start, end)
+            if kind is None or self.kinds[i] == kind
+        ]
+
+    def prerequisites(self, code):
+        """
+        Every course `code` requires, directly or transitively.
+        """
+        node = self.node(code)
+        return self.codes_of(self.reach[self.component_of[node]], exclude=node)
+
+    def unlocks(self, code):
+        """
+        Every course that requires `code`, directly or transitively.
+        """
+        node = self.node(code)
+        return self.codes_of(self.reverse_reach[self.component_of[node]], exclude=node)
+
+    def requires(self, code, other):
+        node, target = self.node(code), self.node(other)
+        return node != target and bool(
+            self.reach[self.component_of[node]] >> target & 1
+        )
+
+    def depth(self, code):
+        """
+        Length of the longest requirement chain below `code` (0 when it has no
+        requirements); a cycle counts as a single step.
+        """
+        return self.depths[self.component_of[self.node(code)]]
+
+    def shortest_path(self, code, other):
+        """
+        Shortest requirement chain from `code` down to `other`, as a list of
+        codes starting with `code`, or None if `code` doesn't require it.
+        """
+        source, target = self.node(code), self.node(other)
+        if source == target:
+            return [self.codes[source]]
+        if not self.requires(code, other):
+            return None
+
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for successor in self.successors(node):
+                if successor in parents:
+                    continue
+                parents[successor] = node
+                if successor == target:
+                    path = []
+                    while successor is not None:
+                        path.append(self.codes[successor])
+                        successor = parents[successor]
+                    return path[::-1]
+                queue.append(successor)
+        return None
+
+    def cycles(self):
+        """
+        Groups of courses that (transitively) require each other.
+        """
+        return [
+            sorted(self.codes[node] for node in nodes)
+            for nodes in self.components
+            if len(nodes) > 1
+        ]
+
+    def dangling(self):
+        """
+        (course, code) pairs where the required code isn't in the catalog.
+        """
+        return [
+            (self.codes[node], self.codes[target])
+            for node in range(len(self.codes))
+            if self.known[node]
+            for target in self.successors(node)
+            if not self.known[target]
+        ]
+
+    def dependencies(self):
+        """
+        code -> sorted transitive requirements for every catalog course, the
+        shape the /course/:code/dependencies endpoint can serve directly.
+        """
+        return {
+            code: self.prerequisites(code)
+            for node, code in enumerate(self.codes)
+            if self.known[node]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the prerequisite graph.")
+    parser.add_argument("input", help="coursespider export, JSON array or JSON Lines")
+    parser.add_argument(
+        "--no-coreqs", action="store_true", help="only follow prerequisites"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help in (
+        ("deps", "everything a course requires"),
+        ("unlocks", "everything that requires a course"),
+        ("depth", "longest requirement chain below a course"),
+    ):
+        commands.add_parser(name, help=help).add_argument("code")
+    path = commands.add_parser("path", help="shortest requirement chain")
+    path.add_argument("code")
+    path.add_argument("other")
+    commands.add_parser("check", help="report cycles and dangling codes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = PrereqGraph.from_courses(
+        iter_courses(args.input), include_coreqs=not args.no_coreqs
+    )
+    print(
+        f"{sum(graph.known)} courses, {len(graph.targets)} requirements "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+    start = time.perf_counter()
+    if args.command == "deps":
+        result = graph.prerequisites(args.code)
+    elif args.command == "unlocks":
+        result = graph.unlocks(args.code)
+    elif args.command == "depth":
+        result = graph.depth(args.code)
+    elif args.command == "path":
+        result = graph.shortest_path(args.code, args.other)
+    else:
+        result = {"cycles": graph.cycles(), "dangling": graph.dangling()}
+    elapsed = time.perf_counter() - start
+
+    if isinstance(result, dict):
+        for cycle in result["cycles"]:
+            print("cycle: " + " -> ".join(cycle))
+        for course, code in result["dangling"]:
+            print(f"dangling: {course} requires unknown {code}")
+    elif isinstance(result, list):
+        print(" -> ".join(result) if args.command == "path" else " ".join(result))
+    else:
+        print(result)
+    print(f"query took {elapsed * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,31 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
-import scrapy
+from dataclasses import dataclass
 
 
-class CourseItem(scrapy.Item):
-    # define the fields for your item here like:
-    department = scrapy.Field()
-    code = scrapy.Field()
-    name = scrapy.Field()
-    hours = scrapy.Field()
-    description = scrapy.Field()
-    restrictions_text = scrapy.Field()  # Keep the raw restrictions text if needed
-    prerequisites = scrapy.Field()
-    corequisites = scrapy.Field()
-    other_restrictions = scrapy.Field()
+# a slotted dataclass rather than scrapy.Item: attribute access instead of
+# ItemAdapter lookups in the pipelines, and orjson serializes it natively
+# (coursescraper/exporters.py)
+@dataclass(slots=True)
+class CourseItem:
+    department: str = None
+    code: str = None
+    name: str = None
+    hours: str = None
+    description: str = None
+    restrictions_text: str = None  # Keep the raw restrictions text if needed
+    prerequisites: list = None
+    corequisites: list = None
+    other_restrictions: list = None
+    prerequisite_tree: dict = None  # AND/OR tree, see coursescraper.requirements
+
+    @classmethod
+    def from_dict(cls, course):
+        """
+        From an exported course; fields the item doesn't have are dropped.
+        """
+        return cls(**{name: course.get(name) for name in cls.__slots__})
+
+    def asdict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
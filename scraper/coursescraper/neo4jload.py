@@ -0,0 +1,208 @@
+"""
+Bulk load a coursespider export into Neo4j.
+
+Courses and REQUIRES edges are written in batched UNWIND transactions, one
+transaction per `batch_size` rows, after the uniqueness constraint on
+Course.code exists (which is also the index the MERGE / MATCH lookups use).
+A cross-listed course is loaded from its first listing only, as in the
+dependency artifact and the search index.
+
+    cd scraper
+    NEO4J_USERNAME=neo4j NEO4J_PASSWORD=... \\
+        python -m coursescraper.neo4jload ncsu_courses.json --batch-size 2000
+    python -m coursescraper.neo4jload ncsu_courses.json --memory
+
+--memory loads into MemoryTarget instead of a database, which runs the same
+batches through a plain-Python model of the three statements.
+"""
+
+import argparse
+import os
+import time
+
+from coursescraper.catalog import iter_courses
+
+SETUP = (
+    "CREATE CONSTRAINT course_code IF NOT EXISTS "
+    "FOR (c:Course) REQUIRE c.code IS UNIQUE",
+)
+
+COURSES = """
+UNWIND $rows AS row
+MERGE (c:Course {code: row.code})
+SET c.name = row.name,
+    c.hours = row.hours,
+    c.description = row.description,
+    c.restrictions = row.restrictions,
+    c.department = row.department
+"""
+
+# edges to codes that aren't in the catalog are skipped by the MATCH
+REQUIRES = """
+UNWIND $rows AS row
+MATCH (parent:Course {code: row.parent})
+MATCH (child:Course {code: row.child})
+MERGE (parent)-[:REQUIRES {type: row.type}]->(child)
+"""
+
+
+def course_row(course):
+    return {
+        "code": course["code"],
+        "name": course.get("name"),
+        "hours": course.get("hours"),
+        "description": course.get("description"),
+        "restrictions": course.get("restrictions_text") or "",
+        "department": course.get("department"),
+    }
+
+
+def edge_rows(course):
+    for field, kind in (("prerequisites", "prereq"), ("corequisites", "coreq")):
+        for code in course.get(field) or []:
+            yield {"parent": course["code"], "child": code, "type": kind}
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Neo4jTarget:
+    def __init__(self, uri, username, password, database=None):
+        try:
+            import neo4j
+        except ImportError:
+            raise ImportError("loading into Neo4j needs its driver: pip install neo4j")
+        self.driver = neo4j.GraphDatabase.driver(uri, auth=(username, password))
+        self.driver.verify_connectivity()
+        self.database = database
+
+    def setup(self, statements):
+        with self.driver.session(database=self.database) as session:
+            for statement in statements:
+                session.run(statement).consume()
+
+    def write(self, query, rows):
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+
+    def close(self):
+        self.driver.close()
+
+
+class MemoryTarget:
+    """
+    In-memory stand-in with the semantics of SETUP, COURSES and REQUIRES:
+    courses merged by code, edges merged by (parent, child, type) and only
+    between existing courses.
+    """
+
+    def __init__(self):
+        self.courses = {}
+        self.edges = set()
+        self.transactions = 0
+        self.handlers = {COURSES: self.merge_courses, REQUIRES: self.merge_edges}
+
+    def setup(self, statements):
+        pass
+
+    def write(self, query, rows):
+        self.handlers[query](rows)
+        self.transactions += 1
+
+    def merge_courses(self, rows):
+        for row in rows:
+            self.courses.setdefault(row["code"], {}).update(row)
+
+    def merge_edges(self, rows):
+        for row in rows:
+            if row["parent"] in self.courses and row["child"] in self.courses:
+                self.edges.add((row["parent"], row["child"], row["type"]))
+
+    def close(self):
+        pass
+
+
+def load(target, courses, batch_size=1000):
+    """
+    Writes courses, then their edges, in batches. Returns (courses, edges,
+    seconds), counting rows sent (edges to unknown codes included).
+    """
+    start = time.perf_counter()
+    target.setup(SETUP)
+
+    # edges need both ends in the database, so they go after every course
+    edges = []
+    seen = set()
+
+    def rows():
+        for course in courses:
+            # later listings of a cross-listed course would overwrite the first
+            if course["code"] in seen:
+                continue
+            seen.add(course["code"])
+            edges.extend(edge_rows(course))
+            yield course_row(course)
+
+    course_count = 0
+    for batch in batched(rows(), batch_size):
+        target.write(COURSES, batch)
+        course_count += len(batch)
+    for batch in batched(edges, batch_size):
+        target.write(REQUIRES, batch)
+
+    return course_count, len(edges), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load courses into Neo4j.")
+    parser.add_argument("input", help="coursespider export, JSON array or JSON Lines")
+    parser.add_argument(
+        "--uri", default=os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+    )
+    parser.add_argument("--database", help="default: the server's default database")
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="rows per transaction"
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="load into the in-memory stand-in"
+    )
+    args = parser.parse_args()
+
+    if args.memory:
+        target = MemoryTarget()
+    else:
+        target = Neo4jTarget(
+            args.uri,
+            os.environ.get("NEO4J_USERNAME"),
+            os.environ.get("NEO4J_PASSWORD"),
+            args.database,
+        )
+    try:
+        courses, edges, elapsed = load(
+            target, iter_courses(args.input), args.batch_size
+        )
+    finally:
+        target.close()
+
+    print(
+        f"loaded {courses} courses and {edges} edges in {elapsed:.2f}s "
+        f"({(courses + edges) / elapsed:,.0f} rows/s)"
+    )
+    if args.memory:
+        print(
+            f"{len(target.courses)} distinct courses, "
+            f"{len(target.edges)} edges kept, "
+            f"{target.transactions} transactions"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+On-disk cache of raw responses with conditional revalidation.
+
+Bodies are stored once per sha256 under blobs/, and each cached request has a
+small JSON entry under index/<partition>/ pointing at its blob along with the
+validators (ETag / Last-Modified) the server sent. Requests are keyed by
+`meta["cache_key"]` when the spider sets one (the meeting spider uses
+term/department, since every search.php call is a POST to the same URL) and
+by method + url + body otherwise. `meta["cache_partition"]` groups entries so
+a whole term can be pruned at once.
+
+Modes (PAGECACHE_MODE):
+    revalidate  send If-None-Match / If-Modified-Since, serve the cached body on 304
+    replay      serve only from disk, never touch the network
+
+Maintenance:
+    python -m coursescraper.pagecache stats
+    python -m coursescraper.pagecache prune --partition 2251
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+
+DEFAULT_PARTITION = "default"
+
+
+class PageCacheStorage:
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.index_dir = self.cache_dir / "index"
+
+    def entry_path(self, partition, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.index_dir / partition / f"{digest}.json"
+
+    def blob_path(self, digest):
+        return self.blob_dir / digest[:2] / digest
+
+    def load(self, partition, key):
+        try:
+            with open(self.entry_path(partition, key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def has_body(self, entry):
+        return self.blob_path(entry["body"]).exists()
+
+    def load_body(self, entry):
+        try:
+            return self.blob_path(entry["body"]).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def store(self, partition, key, url, status, headers, body):
+        """
+        Writes the entry and returns it along with whether the body changed.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        previous = self.load(partition, key)
+
+        blob_path = self.blob_path(digest)
+        if not blob_path.exists():
+            write_atomic(blob_path, body)
+
+        entry = {
+            "key": key,
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "body": digest,
+            "etag": first_header(headers, "ETag"),
+            "last_modified": first_header(headers, "Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self.write_entry(partition, key, entry)
+        return entry, previous is None or previous["body"] != digest
+
+    def touch(self, partition, key, entry):
+        entry["fetched_at"] = time.time()
+        self.write_entry(partition, key, entry)
+
+    def write_entry(self, partition, key, entry):
+        write_atomic(self.entry_path(partition, key), json.dumps(entry).encode("utf-8"))
+
+    def partitions(self):
+        if not self.index_dir.exists():
+            return []
+        return sorted(path.name for path in self.index_dir.iterdir() if path.is_dir())
+
+    def iter_entries(self):
+        for partition in self.partitions():
+            for path in (self.index_dir / partition).glob("*.json"):
+                with open(path, "r", encoding="utf-8") as f:
+                    yield partition, json.load(f)
+
+    def prune(self, partitions=(), older_than=None):
+        """
+        Drops whole partitions and/or entries fetched before `older_than`
+        (a timestamp), then removes blobs nothing points at any more.
+        Returns (entries removed, blobs removed).
+        """
+        removed_entries = 0
+        for partition in partitions:
+            partition_dir = self.index_dir / partition
+            if partition_dir.exists():
+                removed_entries += sum(1 for _ in partition_dir.glob("*.json"))
+                shutil.rmtree(partition_dir)
+
+        if older_than is not None:
+            for partition in self.partitions():
+                for path in (self.index_dir / partition).glob("*.json"):
+                    with open(path, "r", encoding="utf-8") as f:
+                        fetched_at = json.load(f)["fetched_at"]
+                    if fetched_at < older_than:
+                        path.unlink()
+                        removed_entries += 1
+
+        referenced = {entry["body"] for _, entry in self.iter_entries()}
+        removed_blobs = 0
+        if self.blob_dir.exists():
+            for path in self.blob_dir.glob("*/*"):
+                if path.name not in referenced:
+                    path.unlink()
+                    removed_blobs += 1
+
+        return removed_entries, removed_blobs
+
+
+def write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def first_header(headers, name):
+    for header, values in headers.items():
+        if header.lower() == name.lower() and values:
+            return values[0]
+    return None
+
+
+class PageCacheMiddleware:
+    """
+    Downloader middleware in front of PageCacheStorage. Sits where scrapy's
+    HttpCacheMiddleware would (900) so cached bodies are stored still
+    compressed and go back through HttpCompressionMiddleware on replay.
+    """
+
+    def __init__(self, storage, mode, expiration_secs, stats):
+        self.storage = storage
+        self.mode = mode
+        self.expiration_secs = expiration_secs
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("PAGECACHE_ENABLED"):
+            raise NotConfigured
+        mode = settings.get("PAGECACHE_MODE", "revalidate")
+        if mode not in ("revalidate", "replay"):
+            raise NotConfigured(f"unknown PAGECACHE_MODE {mode!r}")
+
+        storage = PageCacheStorage(
+            data_path(settings.get("PAGECACHE_DIR", "pagecache"), createdir=True)
+        )
+        return cls(
+            storage, mode, settings.getint("PAGECACHE_EXPIRATION_SECS"), crawler.stats
+        )
+
+    def request_key(self, request):
+        key = request.meta.get("cache_key")
+        partition = request.meta.get("cache_partition", DEFAULT_PARTITION)
+        if key is None:
+            body_digest = hashlib.sha256(request.body).hexdigest()
+            key = f"{request.method} {request.url} {body_digest}"
+        return str(partition), key
+
+    def process_request(self, request, spider):
+        partition, key = self.request_key(request)
+        entry = self.storage.load(partition, key)
+
+        if self.mode == "replay":
+            response = entry and self.cached_response(request, entry)
+            if response is None:
+                self.stats.inc_value("pagecache/replay_miss", spider=spider)
+                raise IgnoreRequest(f"not in page cache: {request.url}")
+            self.stats.inc_value("pagecache/hit", spider=spider)
+            return response
+
+        # an entry whose blob was pruned can't answer a 304
+        if entry is None or not self.storage.has_body(entry):
+            self.stats.inc_value("pagecache/miss", spider=spider)
+            return None
+
+        age = time.time() - entry["fetched_at"]
+        if self.expiration_secs and age < self.expiration_secs:
+            response = self.cached_response(request, entry)
+            if response is not None:
+                self.stats.inc_value("pagecache/hit", spider=spider)
+                return response
+
+        if entry.get("etag"):
+            request.headers.setdefault("If-None-Match", entry["etag"])
+        if entry.get("last_modified"):
+            request.headers.setdefault("If-Modified-Since", entry["last_modified"])
+        request.meta["_pagecache_entry"] = entry
+        return None
+
+    def process_response(self, request, response, spider):
+        if "cached" in response.flags:
+            return response
+
+        partition, key = self.request_key(request)
+        entry = request.meta.pop("_pagecache_entry", None)
+
+        if response.status == 304 and entry is not None:
+            cached = self.cached_response(request, entry)
+            if cached is not None:
+                self.storage.touch(partition, key, entry)
+                self.stats.inc_value("pagecache/revalidated", spider=spider)
+                return cached
+            # the blob went missing after the request was sent: fetch the page
+            # again without the validators, as a miss
+            self.stats.inc_value("pagecache/miss", spider=spider)
+            request = request.replace(dont_filter=True)
+            request.headers.pop("If-None-Match", None)
+            request.headers.pop("If-Modified-Since", None)
+            return request
+
+        if response.status == 200:
+            headers = {
+                header.decode("latin-1"): [value.decode("latin-1") for value in values]
+                for header, values in response.headers.items()
+            }
+            _, changed = self.storage.store(
+                partition, key, response.url, response.status, headers, response.body
+            )
+            self.stats.inc_value(
+                "pagecache/changed" if changed else "pagecache/unchanged", spider=spider
+            )
+
+        return response
+
+    def cached_response(self, request, entry):
+        body = self.storage.load_body(entry)
+        if body is None:
+            return None
+        headers = Headers(entry["headers"])
+        response_class = responsetypes.from_args(
+            headers=headers, url=entry["url"], body=body
+        )
+        return response_class(
+            url=entry["url"],
+            status=entry["status"],
+            headers=headers,
+            body=body,
+            request=request,
+            flags=["cached"],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the page cache.")
+    parser.add_argument(
+        "--dir", default=".scrapy/pagecache", help="default: %(default)s"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="entries and bytes per partition")
+    prune = commands.add_parser("prune", help="drop partitions or old entries")
+    prune.add_argument(
+        "--partition", action="append", default=[], help="e.g. a term like 2251"
+    )
+    prune.add_argument(
+        "--older-than-days", type=float, help="drop entries fetched before this"
+    )
+    args = parser.parse_args()
+
+    storage = PageCacheStorage(args.dir)
+    if args.command == "stats":
+        counts = {}
+        for partition, _ in storage.iter_entries():
+            counts[partition] = counts.get(partition, 0) + 1
+        for partition, count in sorted(counts.items()):
+            print(f"{partition}: {count} entries")
+        blob_bytes = sum(path.stat().st_size for path in storage.blob_dir.glob("*/*"))
+        print(f"blobs: {blob_bytes:,} bytes")
+    else:
+        older_than = None
+        if args.older_than_days is not None:
+            older_than = time.time() - args.older_than_days * 86400
+        removed_entries, removed_blobs = storage.prune(args.partition, older_than)
+        print(f"removed {removed_entries} entries and {removed_blobs} blobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,131 +4,222 @@
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
 
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+from scrapy import signals
+import hashlib
+import json
+import os
 import re
 
+from coursescraper.requirements import RequirementParser
+from coursescraper.restrictions import RestrictionParser
+from coursescraper.schools import SchoolAdapter
+
+# for spiders without a school adapter
+HOURS_PATTERN = re.compile(SchoolAdapter.hours_pattern)
+# everything starting with "not"
+NOT_PATTERN = re.compile(r"\bnot\b.*", re.IGNORECASE)
+# CourseItem fields as scraped, before the restrictions are parsed
+STRING_FIELDS = (
+    "department",
+    "code",
+    "name",
+    "hours",
+    "description",
+    "restrictions_text",
+)
+
 
 class CoursescraperPipeline:
+    restriction_parser = RestrictionParser()
+    requirement_parser = RequirementParser()
+
     def process_item(self, item, spider):
-        adapter = ItemAdapter(item)
-        field_names = adapter.field_names()
+        # per-school code and hours formats when the spider crawls a school
+        return self.parse_item(item, getattr(spider, "school", None))
+
+    def parse_item(self, item, school=None):
+        """
+        process_item for a school adapter rather than a spider, e.g. when
+        re-parsing a saved export.
+        """
+        restriction_parser = school.restriction_parser if school else None
+        requirement_parser = (
+            school.requirement_parser if school else self.requirement_parser
+        )
+        hours_pattern = school.hours_regex if school else HOURS_PATTERN
 
         # Remove non-breaking spaces and strip whitespace
-        for field_name in field_names:
-            value = adapter.get(field_name)
+        for field_name in STRING_FIELDS:
+            value = getattr(item, field_name)
             if value is not None and isinstance(value, str):
-                adapter[field_name] = value.replace("\xa0", " ").strip()
+                setattr(item, field_name, value.replace("\xa0", " ").strip())
 
         # Extract credit hours
-        hours = adapter.get("hours")
-        if hours:
-            match = re.search(r"\(([\d-]+) credit hours\)", hours)
+        if item.hours:
+            match = hours_pattern.search(item.hours)
             if match:
-                adapter["hours"] = match.group(1)
+                item.hours = match.group(1)
 
         # Parse restrictions_text into prerequisites, corequisites, and other_restrictions
-        restrictions_text = adapter.get("restrictions_text")
+        restrictions_text = item.restrictions_text
         if restrictions_text:
             # remove everything starting with "not"
-            restrictions_text = re.sub(
-                r"\bnot\b.*", "", restrictions_text, flags=re.IGNORECASE
-            ).strip()
-            adapter["restrictions_text"] = restrictions_text
+            restrictions_text = NOT_PATTERN.sub("", restrictions_text).strip()
+            item.restrictions_text = restrictions_text
 
             parsed_restrictions = self.parse_restrictions(
-                restrictions_text, adapter.get("department")
+                restrictions_text, item.department, restriction_parser
+            )
+            item.prerequisites = parsed_restrictions["prerequisites"]
+            item.corequisites = parsed_restrictions["corequisites"]
+            item.other_restrictions = parsed_restrictions["other_restrictions"]
+            item.prerequisite_tree = requirement_parser.parse(
+                restrictions_text, item.department
             )
-            adapter.update(parsed_restrictions)
 
         return item
 
-    def parse_restrictions(self, text, primary_department):
+    def parse_restrictions(self, text, primary_department, restriction_parser=None):
         """
         Parses the restrictions text and extracts prerequisites, corequisites,
         and other restrictions.
         """
-        prerequisites = []
-        corequisites = []
-        other_restrictions = []
-
-        # Normalize the text
-        text = text.replace("Prerequisite", "Prerequisite")
-        text = text.replace("prerequisite", "Prerequisite")
-        text = text.replace("Corequisite", "Corequisite")
-        text = text.replace("corequisite", "Corequisite")
-        text = text.replace("Co-requisite", "Corequisite")
-        text = text.replace("co-requisite", "Corequisite")
-        text = text.replace("Restricition", "Restriction")  # Fix common typos if any
-
-        # Regex patterns
-        # prereq_pattern = r"Prerequisite[s]?:\s*([^;:\n]+)"
-        # coreq_pattern = r"Corequisite[s]?:\s*([^;:\n]+)"
-        # other_pattern = r"(?!Prerequisite[s]?|Corequisite[s]?:)([^;:\n]+)"
-
-        # updated patterns
-        prereq_pattern = r"[Pp](?:rereq(?:uisite)?s?)?:\s*([^;:\n]+)"  # matches capital and lowercase p, then optionally the string "rereq", the optionally the rest of that, and more optionally the plural s
-        coreq_pattern = r"[Cc](?:oreq(?:uisite)?s?)?:\s*([^;:\n]+)"  # matches capital and lowercase c, then optionally the string "oreq", the optionally the rest of that, and more optionally the plural s
-        other_pattern = r"(?![Pp](?:rereq(?:uisite)?s?)?|[Cc](?:oreq(?:uisite)?s?)?:)([^;:\n]+)"  # matches anything that is not a prerequisite or corequisite to put in the other restrictions
-
-        # Extract prerequisites
-        prereq_matches = re.findall(prereq_pattern, text, re.IGNORECASE)
-        for match in prereq_matches:
-            prerequisites.append(match.strip())
-
-        # Extract corequisites
-        coreq_matches = re.findall(coreq_pattern, text, re.IGNORECASE)
-        for match in coreq_matches:
-            corequisites.append(match.strip())
-
-        # Remove extracted parts to find other restrictions
-        text_cleaned = re.sub(prereq_pattern, "", text, flags=re.IGNORECASE)
-        text_cleaned = re.sub(coreq_pattern, "", text_cleaned, flags=re.IGNORECASE)
-        other_matches = re.findall(other_pattern, text_cleaned, re.IGNORECASE)
-        for match in other_matches:
-            if match.strip():
-                other_restrictions.append(match.strip())
-
-        # Further processing to extract course codes from prerequisites and corequisites
-        prerequisites = self.extract_course_codes(prerequisites, primary_department)
-        corequisites = self.extract_course_codes(corequisites, primary_department)
-        other_restrictions = [res.strip() for res in other_restrictions if res.strip()]
-
-        return {
-            "prerequisites": prerequisites if prerequisites else None,
-            "corequisites": corequisites if corequisites else None,
-            "other_restrictions": other_restrictions if other_restrictions else None,
-        }
-
-    def extract_course_codes(self, texts, primary_department):
+        parser = restriction_parser or self.restriction_parser
+        return parser.parse(text, primary_department)
+
+    def extract_course_codes(self, texts, primary_department, restriction_parser=None):
         """
         Extracts course codes from a list of texts, handling incomplete course codes
         by inferring department codes from the last seen department code.
         """
-        course_codes = []
-        # Define a regex pattern for course codes, e.g., CHE 312 or CHE312, or just 312
-        # Pattern captures either DEPT CODE + number or just number
-        pattern = r"([A-Z]{1,4})\s*(\d{3})|(\d{3})"
-
-        for text in texts:
-            current_dept = None
-            matches = re.findall(pattern, text)
-            for match in matches:
-                dept, number, number_only = match
-                if dept and number:
-                    current_dept = dept.upper()
-                    course_code = f"{current_dept}{number}"
-                    course_codes.append(course_code)
-                elif number_only:
-                    if current_dept:
-                        course_code = f"{current_dept}{number_only}"
-                        course_codes.append(course_code)
-                    elif primary_department:
-                        # Infer department code from primary_department if possible
-                        course_code = f"{primary_department}{number_only}"
-                        course_codes.append(course_code)
-                    else:
-                        # Cannot determine department code, skip or handle accordingly
-                        pass
-
-        return course_codes if course_codes else None
+        parser = restriction_parser or self.restriction_parser
+        return parser.extract_course_codes(texts, primary_department)
+
+
+class CourseDeltaPipeline:
+    """
+    Hashes every parsed course and compares it with the manifest left by the
+    previous crawl, writing only added/changed/removed courses to a JSON Lines
+    delta feed. The full snapshot is still the crawl's normal feed (-o).
+
+    Courses are keyed by department + code since cross-listed courses show up
+    on more than one department page.
+    """
+
+    def __init__(self, manifest_path, delta_path, stats):
+        self.manifest_path = manifest_path
+        self.delta_path = delta_path
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls(
+            crawler.settings.get("COURSE_MANIFEST", "course_manifest.json"),
+            crawler.settings.get("COURSE_DELTA", "course_delta.jsonl"),
+            crawler.stats,
+        )
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
+
+    def open_spider(self, spider):
+        self.previous = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.previous = json.load(f)
+        self.current = {}
+        self.counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+        self.delta_file = open(self.delta_path, "w", encoding="utf-8")
+
+    def process_item(self, item, spider):
+        course = item.asdict()
+        key = f"{course.get('department')}:{course.get('code')}"
+        digest = self.course_hash(course)
+        self.current[key] = digest
+
+        previous = self.previous.get(key)
+        if previous is None:
+            self.write_delta("added", course)
+        elif previous != digest:
+            self.write_delta("changed", course)
+        else:
+            self.counts["unchanged"] += 1
+
+        return item
+
+    def spider_closed(self, spider, reason):
+        if reason == "finished":
+            for key in self.previous.keys() - self.current.keys():
+                department, _, code = key.partition(":")
+                self.write_delta("removed", {"department": department, "code": code})
+            manifest = self.current
+        else:
+            # a partial crawl can't tell removed courses from ones it never reached
+            manifest = {**self.previous, **self.current}
+        self.delta_file.close()
+
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+        for op, count in self.counts.items():
+            self.stats.set_value(f"delta/{op}", count, spider=spider)
+        spider.logger.info(
+            "Course delta: %(added)d added, %(changed)d changed, "
+            "%(removed)d removed, %(unchanged)d unchanged" % self.counts
+        )
+
+    def write_delta(self, op, course):
+        self.counts[op] += 1
+        self.delta_file.write(
+            json.dumps({"op": op, "course": course}, ensure_ascii=False) + "\n"
+        )
+
+    @staticmethod
+    def course_hash(course):
+        normalized = json.dumps(course, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SearchIndexPipeline:
+    """
+    Collects every course's code, name and description and writes the
+    typeahead index (coursescraper/search.py) to SEARCH_INDEX when the crawl
+    finishes. An unset SEARCH_INDEX turns it off.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.courses = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls(crawler.settings.get("SEARCH_INDEX"))
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
+
+    def process_item(self, item, spider):
+        # cross-listed courses show up once per department, index them once
+        if self.path and item.code:
+            self.courses.setdefault(
+                item.code,
+                {"code": item.code, "name": item.name, "description": item.description},
+            )
+        return item
+
+    def spider_closed(self, spider, reason):
+        # a partial crawl would leave most of the catalog unsearchable
+        if not self.path or reason != "finished":
+            return
+        from coursescraper.search import SearchIndex
+
+        school = getattr(spider, "school", None)
+        code_pattern = school.code_pattern if school else None
+        index = SearchIndex.build(self.courses.values(), code_pattern)
+        index.write(self.path)
+        spider.logger.info(
+            "Search index: %d courses, %d words written to %s",
+            len(index.codes),
+            len(index.terms),
+            self.path,
+        )
@@ -0,0 +1,123 @@
+"""
+Named crawl profiles shared by coursespider and meeting_spider.
+
+    scrapy crawl coursespider -s CRAWL_PROFILE=fast
+    scrapy crawl meeting_spider -s CRAWL_PROFILE=replay
+
+polite  the default: AutoThrottle aiming at a couple of requests in flight
+        per host, with small per-host slots
+fast    for registration week refreshes: wider slots and a higher
+        AutoThrottle target, still backing off when latency climbs
+replay  crawl only from the page cache (PAGECACHE_MODE=replay), with no
+        throttling since nothing touches the network
+
+Concurrency is set per endpoint through DOWNLOAD_SLOTS, keyed by host: the
+catalog is static pages, search.php is a PHP endpoint that slows down
+first. Profile values are applied at spider priority, so settings.py
+loses to them and `-s` on the command line still wins.
+
+CrawlSummary logs pages/sec, bytes, retries and page cache hits when the
+spider closes.
+"""
+
+import logging
+
+from scrapy import signals
+
+CATALOG_HOST = "catalog.ncsu.edu"
+SEARCH_HOST = "webappprd.acs.ncsu.edu"
+
+PROFILES = {
+    "polite": {
+        "CONCURRENT_REQUESTS": 8,
+        "DOWNLOAD_SLOTS": {
+            CATALOG_HOST: {"concurrency": 4, "delay": 0.25},
+            SEARCH_HOST: {"concurrency": 2, "delay": 0.5},
+        },
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 1.0,
+        "AUTOTHROTTLE_MAX_DELAY": 30.0,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 2.0,
+        "RETRY_TIMES": 3,
+    },
+    "fast": {
+        "CONCURRENT_REQUESTS": 32,
+        "DOWNLOAD_SLOTS": {
+            CATALOG_HOST: {"concurrency": 16, "delay": 0},
+            SEARCH_HOST: {"concurrency": 8, "delay": 0},
+        },
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 0.1,
+        "AUTOTHROTTLE_MAX_DELAY": 10.0,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 8.0,
+        "RETRY_TIMES": 5,
+    },
+    "replay": {
+        "PAGECACHE_MODE": "replay",
+        "ROBOTSTXT_OBEY": False,
+        "CONCURRENT_REQUESTS": 64,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 64,
+        "DOWNLOAD_DELAY": 0,
+        "AUTOTHROTTLE_ENABLED": False,
+        "RETRY_ENABLED": False,
+    },
+}
+
+logger = logging.getLogger(__name__)
+
+
+def apply_profile(settings):
+    """
+    Called from the spiders' update_settings.
+    """
+    name = settings.get("CRAWL_PROFILE", "polite")
+    if name not in PROFILES:
+        raise ValueError(
+            f"unknown CRAWL_PROFILE {name!r}, expected one of {', '.join(PROFILES)}"
+        )
+    settings.setdict(PROFILES[name], priority="spider")
+
+
+class CrawlSummary:
+    """
+    Extension that logs a one-glance summary of the crawl stats at the end.
+    """
+
+    def __init__(self, stats, profile):
+        self.stats = stats
+        self.profile = profile
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        extension = cls(crawler.stats, crawler.settings.get("CRAWL_PROFILE", "polite"))
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_closed(self, spider, reason):
+        stats = self.stats.get_stats(spider)
+        elapsed = stats.get("elapsed_time_seconds") or 0
+        pages = stats.get("downloader/response_count", 0)
+        cached = stats.get("pagecache/hit", 0) + stats.get("pagecache/revalidated", 0)
+        received = stats.get("downloader/response_bytes", 0)
+        rate = pages / elapsed if elapsed else 0
+
+        statuses = ", ".join(
+            f"{key.rsplit('/', 1)[-1]}: {count}"
+            for key, count in sorted(stats.items())
+            if key.startswith("downloader/response_status_count/")
+        )
+        logger.info(
+            "crawl summary (%s profile, %s): %d pages in %.1fs (%.1f pages/sec), "
+            "%d from the page cache, %.1f MB received, %d retries, "
+            "%d items, statuses: %s",
+            self.profile,
+            reason,
+            pages,
+            elapsed,
+            rate,
+            cached,
+            received / 1e6,
+            stats.get("retry/count", 0),
+            stats.get("item_scraped_count", 0),
+            statuses or "none",
+        )
@@ -0,0 +1,136 @@
+"""
+Rebuild prerequisites, corequisites and other_restrictions from a saved
+coursespider export without re-crawling catalog.ncsu.edu.
+
+    cd scraper
+    python -m coursescraper.reparse ncsu_courses.json -o reparsed.json \\
+        --diff changes.jsonl --workers 4 --school ncsu
+
+Every course is streamed through CoursescraperPipeline.parse_item, with the
+school adapter's code and hours formats, and written to the new export;
+courses whose output changed are written to the diff as JSON Lines. The saved
+restrictions_text already had the "not ..." tail removed during the crawl, so
+changes to that rule still need a real crawl.
+"""
+
+import argparse
+import multiprocessing
+import time
+from contextlib import nullcontext
+
+from coursescraper.catalog import CourseWriter, iter_courses
+from coursescraper.items import CourseItem
+from coursescraper.pipelines import CoursescraperPipeline
+from coursescraper.schools import SCHOOLS, get_school
+
+# fields the pipeline derives from restrictions_text
+DERIVED_FIELDS = (
+    "prerequisites",
+    "corequisites",
+    "other_restrictions",
+    "prerequisite_tree",
+)
+
+pipeline = CoursescraperPipeline()
+# the school adapter courses are parsed for, set per process by use_school
+school = None
+
+
+def use_school(name):
+    global school
+    school = get_school(name)
+
+
+def reparse_course(course):
+    item = CourseItem.from_dict(course)
+    for field in DERIVED_FIELDS:
+        setattr(item, field, None)
+    return pipeline.parse_item(item, school).asdict()
+
+
+def diff_course(old, new):
+    changes = {}
+    for field in list(old) + [field for field in new if field not in old]:
+        if old.get(field) != new.get(field):
+            changes[field] = {"old": old.get(field), "new": new.get(field)}
+    return changes
+
+
+def reparse_with_diff(course):
+    reparsed = reparse_course(course)
+    return reparsed, diff_course(course, reparsed)
+
+
+def reparse_catalog(
+    input_path, output_path, diff_path=None, workers=1, chunksize=256, school="ncsu"
+):
+    """
+    Streams input_path through the pipeline and returns (courses, changed).
+    school: name of the adapter whose code format the courses use.
+    """
+    courses = iter_courses(input_path)
+    use_school(school)
+    pool = (
+        multiprocessing.Pool(workers, initializer=use_school, initargs=(school,))
+        if workers > 1
+        else None
+    )
+    results = (
+        pool.imap(reparse_with_diff, courses, chunksize)
+        if pool
+        else map(reparse_with_diff, courses)
+    )
+
+    total = 0
+    changed = 0
+    try:
+        with CourseWriter(output_path) as writer, (
+            CourseWriter(diff_path) if diff_path else nullcontext()
+        ) as diff_writer:
+            for reparsed, changes in results:
+                writer.write(reparsed)
+                total += 1
+                if changes:
+                    changed += 1
+                    if diff_writer:
+                        diff_writer.write(
+                            {"code": reparsed.get("code"), "changes": changes}
+                        )
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return total, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-parse restrictions in a saved coursespider export."
+    )
+    parser.add_argument("input", help="coursespider export (.json or .jsonl)")
+    parser.add_argument(
+        "-o", "--output", required=True, help="new export (.json or .jsonl)"
+    )
+    parser.add_argument("--diff", help="write changed courses here (.jsonl)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--chunksize", type=int, default=256)
+    parser.add_argument(
+        "--school", default="ncsu", choices=sorted(SCHOOLS), help="code format"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total, changed = reparse_catalog(
+        args.input, args.output, args.diff, args.workers, args.chunksize, args.school
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"reparsed {total} courses in {elapsed:.2f}s "
+        f"({total / elapsed if elapsed else 0:,.0f} courses/sec), {changed} changed"
+    )
+
+
+if __name__ == "__main__":
+    main()
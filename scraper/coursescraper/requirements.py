@@ -0,0 +1,254 @@
+"""
+Boolean structure of prerequisite text.
+
+extract_course_codes flattens "CSC 116 or CSC 216, and MA 141" into a list;
+RequirementParser keeps the AND/OR structure as a small JSON tree:
+
+    {"op": "and", "args": [
+        {"op": "or", "args": [{"course": "CSC116"}, {"course": "CSC216"}]},
+        {"course": "MA141", "grade": "C"},
+    ]}
+
+Leaves are {"course": code} (with "grade" for "C or better" style minimums),
+{"standing": "junior"} and {"permission": true} for "or permission of
+instructor" style alternatives. Codes are built the same way as in
+extract_course_codes: a bare number takes the department before it, or the
+course's own.
+
+Connectives, loosest first: ";" is AND, a comma right before "and"/"or"
+splits at that connective, plain "or" binds looser than plain "and", and a
+bare comma means whichever of "and"/"or" its list ends with ("A, B, or C").
+Parentheses group.
+"""
+
+import re
+
+from coursescraper.restrictions import RestrictionParser
+
+# "permission of (the) instructor", "consent of department", "instructor approval"
+PERMISSION = r"""
+    (?:(?:the\s+)?(?:written\s+)?(?:permission|consent|approval)\s+of\s+(?:the\s+)?
+        (?:instructor|department|advisor|adviser|program)
+    | (?:instructor|department|departmental)(?:'s)?\s+(?:permission|consent|approval))
+"""
+
+# the code alternative holds a school's code pattern (see RestrictionParser)
+# with its department, number and bare number groups, which are the three
+# groups right after "code"
+TOKEN_TEMPLATE = r"""
+    (?P<grade>
+        (?i:(?:with\s+)?(?:an?\s+)?(?:minimum\s+)?grade\s+of\s+)?
+        (?P<letter>[A-D][+-]?)\s+(?i:or\s+(?:better|higher|above))
+        (?P<forward>\s+(?i:in)\b)?
+    )
+    | (?P<standing>(?i:freshman|sophomore|junior|senior|graduate))\s+(?i:standing)
+    | (?P<permission>(?i:{permission}))
+    | (?P<code>(?-x:{code}))
+    | (?P<and>(?i:\band\b)|&)
+    | (?P<or>(?i:\bor\b))
+    | (?P<comma>,)
+    | (?P<semi>;)
+    | (?P<open>\()
+    | (?P<close>\))
+"""
+
+STANDING_PATTERN = re.compile(
+    rf"""\b(freshman|sophomore|junior|senior|graduate)\s+standing
+    (\s+or\s+{PERMISSION})?""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def compile_tokens(code_pattern):
+    return re.compile(
+        TOKEN_TEMPLATE.format(permission=PERMISSION, code=code_pattern), re.VERBOSE
+    )
+
+
+def node(op, args):
+    """
+    AND/OR node with missing operands dropped, nested nodes of the same op
+    flattened and single operands unwrapped.
+    """
+    flat = []
+    for arg in args:
+        if arg is None:
+            continue
+        if arg.get("op") == op:
+            flat.extend(arg["args"])
+        elif arg not in flat:
+            flat.append(arg)
+    if not flat:
+        return None
+    if len(flat) == 1:
+        return flat[0]
+    return {"op": op, "args": flat}
+
+
+def split(items, separator):
+    parts = [[]]
+    for item in items:
+        if item == separator:
+            parts.append([])
+        else:
+            parts[-1].append(item)
+    return parts
+
+
+def combine(items, default="and"):
+    """
+    Builds a tree from a flat list of leaves/trees and connective strings.
+    """
+    if "semi" in items:
+        return node("and", [combine(part) for part in split(items, "semi")])
+
+    # ", and" / ", or" split before anything else
+    strong = {
+        items[i + 1]
+        for i in range(len(items) - 1)
+        if items[i] == "comma" and items[i + 1] in ("and", "or")
+    }
+    if strong:
+        op = "and" if "and" in strong else "or"
+        parts = [[]]
+        i = 0
+        while i < len(items):
+            if items[i] == "comma" and i + 1 < len(items) and items[i + 1] == op:
+                parts.append([])
+                i += 2
+                continue
+            parts[-1].append(items[i])
+            i += 1
+        return node(op, [combine(part, op) for part in parts])
+
+    kinds = {item for item in items if item in ("and", "or")}
+    comma = kinds.pop() if len(kinds) == 1 else default
+    items = [comma if item == "comma" else item for item in items]
+
+    alternatives = []
+    for alternative in split(items, "or"):
+        # operands with nothing between them ("CSC 116 MA 141") are all required
+        operands = [item for item in alternative if item != "and"]
+        alternatives.append(node("and", operands))
+    return node("or", alternatives)
+
+
+class RequirementParser:
+    token_pattern = compile_tokens(RestrictionParser.code_pattern.pattern)
+
+    def __init__(self, code_pattern=None):
+        """
+        code_pattern: another school's course codes, as for RestrictionParser.
+        """
+        self.restriction_parser = RestrictionParser(code_pattern)
+        if code_pattern is not None:
+            self.token_pattern = compile_tokens(code_pattern)
+
+    def parse(self, text, primary_department):
+        """
+        Tree for all prerequisite segments of a restrictions text, AND-ed
+        together with any class standing required outside them ("...; Junior
+        standing"), or None when there is nothing to require.
+        """
+        text = self.restriction_parser.normalize(text)
+        trees = []
+        position = 0
+        for match in self.restriction_parser.segment_pattern.finditer(text):
+            trees.extend(self.standings(text, position, match.start()))
+            if match.group(1):
+                trees.append(self.parse_segment(match.group(1), primary_department))
+            position = match.end()
+        trees.extend(self.standings(text, position, len(text)))
+        return node("and", trees)
+
+    def standings(self, text, start, end):
+        trees = []
+        for match in STANDING_PATTERN.finditer(text, start, end):
+            standing = {"standing": match.group(1).lower()}
+            if match.group(2):
+                # "Junior standing or permission of instructor"
+                standing = node("or", [standing, {"permission": True}])
+            trees.append(standing)
+        return trees
+
+    def parse_segment(self, text, primary_department):
+        tokens = self.tokenize(text, primary_department)
+        items, _ = self.group(tokens, 0)
+        return combine(items)
+
+    def tokenize(self, text, primary_department):
+        tokens = []
+        current_dept = None
+        pending_grade = None
+        code_group = self.token_pattern.groupindex["code"]
+        for match in self.token_pattern.finditer(text):
+            kind = match.lastgroup
+            if kind == "grade":
+                letter = match.group("letter")
+                if match.group("forward"):
+                    # "C or better in CSC 116"
+                    pending_grade = letter
+                else:
+                    # "CSC 116 with a grade of C or better"
+                    for token in reversed(tokens):
+                        if isinstance(token, dict):
+                            if "course" in token:
+                                token["grade"] = letter
+                            break
+                continue
+
+            if kind == "standing":
+                tokens.append({"standing": match.group("standing").lower()})
+                continue
+            if kind == "permission":
+                tokens.append({"permission": True})
+                continue
+            if kind == "code":
+                dept, number, bare = match.group(
+                    code_group + 1, code_group + 2, code_group + 3
+                )
+                if number:
+                    current_dept = dept
+                    code = dept + number
+                else:
+                    dept = current_dept or primary_department
+                    if not dept:
+                        continue
+                    code = dept + bare
+            else:
+                tokens.append(kind)
+                continue
+
+            leaf = {"course": code}
+            if pending_grade:
+                leaf["grade"] = pending_grade
+                pending_grade = None
+            tokens.append(leaf)
+        return tokens
+
+    def group(self, tokens, position):
+        """
+        Folds parenthesized runs into trees. Returns (items, next position).
+        """
+        items = []
+        while position < len(tokens):
+            token = tokens[position]
+            position += 1
+            if token == "open":
+                inner, position = self.group(tokens, position)
+                items.append(combine(inner))
+            elif token == "close":
+                break
+            else:
+                items.append(token)
+        return [item for item in items if item is not None], position
+
+
+def leaves(tree):
+    if tree is None:
+        return
+    if "op" in tree:
+        for arg in tree["args"]:
+            yield from leaves(arg)
+    else:
+        yield tree
@@ -0,0 +1,183 @@
+import re
+
+# keyword forms, e.g. "P:", "Prereq:", "Prerequisites:", "C:", "Coreq:", "Corequisite:"
+PREREQ_KEYWORD = r"[Pp](?:rereq(?:uisite)?s?)?"
+COREQ_KEYWORD = r"[Cc](?:oreq(?:uisite)?s?)?"
+
+# spelling fixes applied before parsing, in the order they used to be chained
+NORMALIZATIONS = {
+    "prerequisite": "Prerequisite",
+    "corequisite": "Corequisite",
+    "Co-requisite": "Corequisite",
+    "co-requisite": "Corequisite",
+    "Restricition": "Restriction",  # Fix common typos if any
+}
+
+
+class RestrictionParser:
+    """
+    Parses restrictions text into prerequisites, corequisites, and other
+    restrictions.
+
+    All patterns are compiled once. Text is tokenized in a single scan that
+    emits prereq/coreq segments with their course codes and collects the
+    leftover text for other restrictions as it goes. Inputs where the old
+    findall/sub passes would have overlapped (a segment that ends in another
+    "P:"/"C:" keyword) are rare and go through `parse_multipass`, which is the
+    original algorithm, so output is identical either way.
+    """
+
+    prereq_pattern = re.compile(PREREQ_KEYWORD + r":\s*([^;:\n]+)", re.IGNORECASE)
+    coreq_pattern = re.compile(COREQ_KEYWORD + r":\s*([^;:\n]+)", re.IGNORECASE)
+    other_pattern = re.compile(
+        rf"(?!{PREREQ_KEYWORD}|{COREQ_KEYWORD}:)([^;:\n]+)", re.IGNORECASE
+    )
+
+    # group 1 is a prerequisite segment, group 2 a corequisite segment
+    segment_pattern = re.compile(
+        rf"{PREREQ_KEYWORD}:\s*([^;:\n]+)|{COREQ_KEYWORD}:\s*([^;:\n]+)",
+        re.IGNORECASE,
+    )
+    # a keyword running right up to the end of a segment or gap
+    keyword_tail_pattern = re.compile(
+        rf"(?:{PREREQ_KEYWORD}|{COREQ_KEYWORD})\Z", re.IGNORECASE
+    )
+    coreq_tail_pattern = re.compile(rf"{COREQ_KEYWORD}\Z", re.IGNORECASE)
+
+    # DEPT CODE + number (CHE 312 or CHE312) or just a number (312)
+    code_pattern = re.compile(r"([A-Z]{1,4})\s*(\d{3})|(\d{3})")
+    # the same, as whole words only, so "CSC 1160" isn't read as CSC116
+    whole_code_pattern = re.compile(rf"\b(?:{code_pattern.pattern})\b")
+
+    def __init__(self, code_pattern=None):
+        """
+        code_pattern: another school's course codes, with the same three
+        groups (department, number, bare number). See coursescraper.schools.
+        """
+        if code_pattern is not None:
+            self.code_pattern = re.compile(code_pattern)
+            self.whole_code_pattern = re.compile(rf"\b(?:{code_pattern})\b")
+
+    def normalize(self, text):
+        # str.replace beats a callback re.sub on strings this short
+        for old, new in NORMALIZATIONS.items():
+            if old in text:
+                text = text.replace(old, new)
+        return text
+
+    def explicit_codes(self, text):
+        """
+        Yields (code, span) for every code written out with its department
+        ("CSC 116", not a bare "116").
+        """
+        for match in self.whole_code_pattern.finditer(text):
+            dept, number = match.group(1, 2)
+            if dept and number:
+                yield dept.upper() + number, match.span()
+
+    def parse(self, text, primary_department):
+        text = self.normalize(text)
+        parsed = self.parse_single_pass(text, primary_department)
+        if parsed is None:
+            parsed = self.parse_multipass(text, primary_department)
+        return parsed
+
+    def parse_single_pass(self, text, primary_department):
+        """
+        Returns None when the text needs the multipass parser.
+        """
+        prerequisites = []
+        corequisites = []
+        other_restrictions = []
+        find_other = self.other_pattern.findall
+        collect_codes = self.collect_codes
+        length = len(text)
+        position = 0
+
+        for match in self.segment_pattern.finditer(text):
+            start, end = match.span()
+            prereq_start = match.start(1)
+            segment_start = prereq_start if prereq_start != -1 else match.start(2)
+
+            if end < length and text[end] == ":":
+                # the segment swallowed the keyword of the next one
+                if self.keyword_tail_pattern.search(text, segment_start, end):
+                    return None
+                # removing this segment would glue a "C" onto the next ":"
+                if self.coreq_tail_pattern.search(text, position, start):
+                    return None
+
+            if position != start:
+                for restriction in find_other(text, position, start):
+                    restriction = restriction.strip()
+                    if restriction:
+                        other_restrictions.append(restriction)
+
+            collect_codes(
+                text,
+                segment_start,
+                end,
+                primary_department,
+                prerequisites if prereq_start != -1 else corequisites,
+            )
+            position = end
+
+        if position != length:
+            for restriction in find_other(text, position, length):
+                restriction = restriction.strip()
+                if restriction:
+                    other_restrictions.append(restriction)
+
+        return {
+            "prerequisites": prerequisites if prerequisites else None,
+            "corequisites": corequisites if corequisites else None,
+            "other_restrictions": other_restrictions if other_restrictions else None,
+        }
+
+    def collect_codes(self, text, start, end, primary_department, course_codes):
+        current_dept = None
+        for dept, number, number_only in self.code_pattern.findall(text, start, end):
+            if dept and number:
+                current_dept = dept.upper()
+                course_codes.append(f"{current_dept}{number}")
+            elif number_only:
+                if current_dept:
+                    course_codes.append(f"{current_dept}{number_only}")
+                elif primary_department:
+                    # Infer department code from primary_department if possible
+                    course_codes.append(f"{primary_department}{number_only}")
+
+    def parse_multipass(self, text, primary_department):
+        """
+        The original findall/sub parser. Expects normalized text.
+        """
+        prerequisites = [match.strip() for match in self.prereq_pattern.findall(text)]
+        corequisites = [match.strip() for match in self.coreq_pattern.findall(text)]
+
+        # Remove extracted parts to find other restrictions
+        text_cleaned = self.prereq_pattern.sub("", text)
+        text_cleaned = self.coreq_pattern.sub("", text_cleaned)
+        other_restrictions = [
+            match.strip()
+            for match in self.other_pattern.findall(text_cleaned)
+            if match.strip()
+        ]
+
+        prerequisites = self.extract_course_codes(prerequisites, primary_department)
+        corequisites = self.extract_course_codes(corequisites, primary_department)
+
+        return {
+            "prerequisites": prerequisites if prerequisites else None,
+            "corequisites": corequisites if corequisites else None,
+            "other_restrictions": other_restrictions if other_restrictions else None,
+        }
+
+    def extract_course_codes(self, texts, primary_department):
+        """
+        Extracts course codes from a list of texts, handling incomplete course codes
+        by inferring department codes from the last seen department code.
+        """
+        course_codes = []
+        for text in texts:
+            self.collect_codes(text, 0, len(text), primary_department, course_codes)
+        return course_codes if course_codes else None
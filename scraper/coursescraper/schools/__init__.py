@@ -0,0 +1,96 @@
+"""
+School adapters: what coursespider needs to know about one university's
+catalog.
+
+An adapter gives the start URLs and domains, CSS selectors for department
+links and course blocks, how a department code is read off a department
+link, and the course code pattern the restriction and requirement parsers
+use for that school. coursespider drives the crawl the same way for every adapter:
+
+    scrapy crawl coursespider -a school=ncsu
+    python -m coursescraper.crawl ncsu ...        # several schools, one process
+
+To add a school, subclass SchoolAdapter in coursescraper/schools/<name>.py,
+fill in the class attributes (override department if its department links
+don't end in the code, and parse_course if its course blocks don't fit the
+selector fields) and register it in SCHOOLS.
+"""
+
+import importlib
+import re
+import unicodedata
+
+from coursescraper.items import CourseItem
+from coursescraper.requirements import RequirementParser
+from coursescraper.restrictions import RestrictionParser
+
+SCHOOLS = {
+    "ncsu": "coursescraper.schools.ncsu.NCSU",
+}
+
+
+def get_school(name):
+    try:
+        path = SCHOOLS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown school {name!r}, expected one of {', '.join(SCHOOLS)}"
+        )
+    module, _, cls = path.rpartition(".")
+    return getattr(importlib.import_module(module), cls)()
+
+
+def clean(text):
+    return unicodedata.normalize("NFKD", text).replace("\xa0", " ").strip()
+
+
+class SchoolAdapter:
+    name = None
+    allowed_domains = ()
+    start_urls = ()
+
+    # keys: department_links (hrefs), course_blocks, and per-field text
+    # selectors inside a block: code, name, hours, description, restrictions
+    selectors = {}
+
+    # groups: department, number, bare number (see RestrictionParser)
+    code_pattern = RestrictionParser.code_pattern.pattern
+    # group 1 is the credit hours the pipeline keeps
+    hours_pattern = r"\(([\d-]+) credit hours\)"
+
+    def __init__(self):
+        self.restriction_parser = RestrictionParser(self.code_pattern)
+        self.requirement_parser = RequirementParser(self.code_pattern)
+        self.hours_regex = re.compile(self.hours_pattern)
+
+    def department(self, link):
+        """
+        Department code for a department page link, by default its last path
+        segment: "/course-descriptions/csc/" -> "CSC".
+        """
+        return link.strip("/").split("/")[-1].upper()
+
+    def department_links(self, response):
+        return response.css(self.selectors["department_links"]).getall()
+
+    def course_blocks(self, response):
+        return response.css(self.selectors["course_blocks"])
+
+    def course_code(self, parts):
+        return "".join(clean(part).replace(" ", "") for part in parts).upper()
+
+    def parse_course(self, block, department):
+        """
+        CourseItem from one course block, fields as scraped.
+        """
+        css = self.selectors
+        restrictions = block.css(css["restrictions"]).getall()
+        return CourseItem(
+            department=department,
+            code=self.course_code(block.css(css["code"]).getall()),
+            name=block.css(css["name"]).get(),
+            hours=block.css(css["hours"]).get(),
+            # Strip and rejoin because of a tags
+            description=" ".join(block.css(css["description"]).getall()).strip(),
+            restrictions_text=" ".join(restrictions).strip() if restrictions else None,
+        )
@@ -0,0 +1,27 @@
+from coursescraper.schools import SchoolAdapter
+
+
+class NCSU(SchoolAdapter):
+    name = "ncsu"
+    allowed_domains = ("catalog.ncsu.edu",)
+    start_urls = ("https://catalog.ncsu.edu/course-descriptions/",)
+
+    selectors = {
+        "department_links": "div.az_sitemap ul li a::attr(href)",
+        "course_blocks": "div.courseblock",
+        "code": (
+            "div.cols .detail-coursecode strong::text, "
+            "div.cols .detail-coursecode strong a::text"
+        ),
+        "name": "div.cols .detail-title strong::text",
+        "hours": "div.cols .detail-hours_html::text",
+        "description": (
+            "div.noindent p.courseblockextra::text, "
+            "div.noindent p.courseblockextra a::text"
+        ),
+        "restrictions": (
+            "p.courseblockextra.noindent a::text, p.courseblockextra.noindent::text"
+        ),
+    }
+
+    # code_pattern, hours_pattern and department() are SchoolAdapter's defaults
@@ -0,0 +1,382 @@
+"""
+Typeahead search over course codes, names and descriptions.
+
+    cd scraper
+    python -m coursescraper.search build ncsu_courses.json -o course_search.idx \\
+        --school ncsu
+    python -m coursescraper.search query course_search.idx "csc 3"
+    python -m coursescraper.search query course_search.idx "data structres"
+
+The crawl also writes the index itself when SEARCH_INDEX is set (see
+SearchIndexPipeline).
+
+Codes: courses are numbered in code order, so the code list is a flattened
+trie and "csc 3" or "CSC31" is a bisect for the first code with that prefix
+and a walk to the last one. Code matches rank ahead of word matches, but
+only for a query with a digit in it or one that is a department exactly:
+"data" lists the DATA courses first when DATA is a department, while "stat"
+only matches words when STAT isn't one. Departments are read off the codes
+with the school's code pattern.
+
+Words: an inverted index over name and description words, scored with BM25
+with name matches weighted up. The score each (word, course) pair would add
+is computed at build time, and postings are stored best-first, so a query
+only sums precomputed impacts and can stop after MAX_POSTINGS per word. The
+last word of a query also matches as a prefix of longer words (typeahead),
+and a word that isn't in the vocabulary matches the words one edit away
+from it (typos).
+
+File layout, little-endian:
+    magic    b"SYLSRCH1"
+    u32      header length
+    header   JSON: codes, names, departments, vocabulary, array types and sizes
+    arrays   term_offsets, post_docs, post_impacts, back to back
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timezone
+
+from coursescraper.catalog import iter_courses
+from coursescraper.restrictions import RestrictionParser
+from coursescraper.schools import SCHOOLS, get_school
+
+MAGIC = b"SYLSRCH1"
+FORMAT = 2
+LENGTH = struct.Struct("<I")
+
+WORD = re.compile(r"[a-z0-9]+")
+LETTERS = "abcdefghijklmnopqrstuvwxyz0123456789"
+DIGIT = re.compile(r"\d")
+
+# BM25 parameters, and how much a word in the name counts against one in
+# the description
+K1 = 1.2
+B = 0.75
+NAME_WEIGHT = 3.0
+
+CODE_SCORE = 1000.0
+# postings read per query word; expanded words (prefixes, typos) only add
+# their best few
+MAX_POSTINGS = 1000
+MAX_EXPANDED_POSTINGS = 100
+PREFIX_WEIGHT = 0.8
+MIN_PREFIX = 2
+MAX_PREFIX_TERMS = 20
+TYPO_WEIGHT = 0.6
+MIN_TYPO_LENGTH = 4
+MAX_TYPO_TERMS = 5
+
+# impacts are stored as one byte, scaled so the largest is IMPACT_LEVELS
+IMPACT_LEVELS = 255
+
+# the arrays after the header, in file order
+ARRAYS = ("term_offsets", "post_docs", "post_impacts")
+
+
+def words(text):
+    return WORD.findall((text or "").lower())
+
+
+def edits(word):
+    """
+    Every string one deletion, transposition, substitution or insertion
+    away from word.
+    """
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    found = {left + right[1:] for left, right in splits if right}
+    found.update(
+        left + right[1] + right[0] + right[2:]
+        for left, right in splits
+        if len(right) > 1
+    )
+    for letter in LETTERS:
+        found.update(left + letter + right[1:] for left, right in splits if right)
+        found.update(left + letter + right for left, right in splits)
+    found.discard(word)
+    return found
+
+
+def normalize_query_code(query):
+    return re.sub(r"[^A-Z0-9]", "", query.upper())
+
+
+def length_norms(field_words):
+    # BM25's document length normalization, per course, for one field
+    average = sum(map(len, field_words)) / max(len(field_words), 1) or 1
+    return [1 - B + B * len(doc_words) / average for doc_words in field_words]
+
+
+class SearchIndex:
+    def __init__(self, codes, names, departments, terms, impact_scale, arrays):
+        self.codes = codes
+        self.names = names
+        self.departments = departments
+        self.terms = terms
+        self.impact_scale = impact_scale
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        self.department_set = set(departments)
+
+    @classmethod
+    def build(cls, courses, code_pattern=None):
+        """
+        courses: dicts with "code", "name" and "description". Cross-listed
+        courses are indexed once, under their first listing.
+
+        code_pattern: the school's course codes, as for RestrictionParser.
+        """
+        by_code = {}
+        for course in courses:
+            by_code.setdefault(course["code"], course)
+        codes = sorted(by_code)
+        code_pattern = re.compile(code_pattern or RestrictionParser.code_pattern)
+        departments = set()
+        for code in codes:
+            match = code_pattern.match(code)
+            if match and match.group(1):
+                departments.add(match.group(1))
+        names = [by_code[code].get("name") or "" for code in codes]
+        name_words = [words(name) for name in names]
+        description_words = [words(by_code[code].get("description")) for code in codes]
+
+        count = len(codes)
+        name_norms = length_norms(name_words)
+        description_norms = length_norms(description_words)
+
+        # word: [(doc, times in name, times in description)]
+        frequencies = {}
+        for doc in range(count):
+            in_name = Counter(name_words[doc])
+            in_description = Counter(description_words[doc])
+            for word in in_name.keys() | in_description.keys():
+                frequencies.setdefault(word, []).append(
+                    (doc, in_name[word], in_description[word])
+                )
+
+        terms = sorted(frequencies)
+        term_offsets = array("I", [0])
+        postings = []
+        for term in terms:
+            docs = frequencies[term]
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            scored = []
+            for doc, name_tf, description_tf in docs:
+                tf = (
+                    NAME_WEIGHT * name_tf / name_norms[doc]
+                    + description_tf / description_norms[doc]
+                )
+                scored.append((-idf * tf * (K1 + 1) / (tf + K1), doc))
+            # best first, so queries can stop early
+            scored.sort()
+            postings.extend(scored)
+            term_offsets.append(len(postings))
+
+        impact_scale = -min((impact for impact, _ in postings), default=0)
+        impact_scale /= IMPACT_LEVELS
+        # two-byte doc ids cover any one school's catalog
+        doc_type = "H" if count <= 0xFFFF else "I"
+        arrays = {
+            "term_offsets": term_offsets,
+            "post_docs": array(doc_type, [doc for _, doc in postings]),
+            "post_impacts": array(
+                "B",
+                [max(1, round(-impact / impact_scale)) for impact, _ in postings],
+            ),
+        }
+        return cls(codes, names, sorted(departments), terms, impact_scale, arrays)
+
+    def write(self, path):
+        header = {
+            "format": FORMAT,
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "courses": len(self.codes),
+            "codes": self.codes,
+            "names": self.names,
+            "departments": self.departments,
+            "terms": self.terms,
+            "impact_scale": self.impact_scale,
+            "arrays": {
+                name: [getattr(self, name).typecode, len(getattr(self, name))]
+                for name in ARRAYS
+            },
+        }
+        header = json.dumps(header, ensure_ascii=False, separators=(",", ":"))
+        header = header.encode("utf-8")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + LENGTH.pack(len(header)) + header)
+            for name in ARRAYS:
+                values = getattr(self, name)
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                f.write(values.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a search index")
+        position = len(MAGIC)
+        (header_length,) = LENGTH.unpack_from(data, position)
+        position += LENGTH.size
+        header = json.loads(data[position : position + header_length])
+        if header["format"] != FORMAT:
+            raise ValueError(f"unsupported search index format {header['format']}")
+        position += header_length
+
+        arrays = {}
+        for name in ARRAYS:
+            typecode, length = header["arrays"][name]
+            values = array(typecode)
+            size = length * values.itemsize
+            values.frombytes(data[position : position + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            arrays[name] = values
+            position += size
+        return cls(
+            header["codes"],
+            header["names"],
+            header["departments"],
+            header["terms"],
+            header["impact_scale"],
+            arrays,
+        )
+
+    def code_prefix(self, prefix):
+        """
+        Doc ids of codes starting with prefix, in code order.
+        """
+        doc = bisect_left(self.codes, prefix)
+        while doc < len(self.codes) and self.codes[doc].startswith(prefix):
+            yield doc
+            doc += 1
+
+    def document_frequency(self, term_id):
+        return self.term_offsets[term_id + 1] - self.term_offsets[term_id]
+
+    def expand(self, word, prefix=False):
+        """
+        [(term id, weight, postings to read)] a query word matches: itself,
+        longer words it starts (for the last word), or else its typos.
+        """
+        matches = []
+        term_id = self.term_ids.get(word)
+        if term_id is not None:
+            matches.append((term_id, 1.0, MAX_POSTINGS))
+
+        if prefix and len(word) >= MIN_PREFIX:
+            first = bisect_left(self.terms, word)
+            last = bisect_left(self.terms, word + "\uffff", first)
+            longer = [other for other in range(first, last) if other != term_id]
+            if len(longer) > MAX_PREFIX_TERMS:
+                longer = heapq.nlargest(
+                    MAX_PREFIX_TERMS, longer, key=self.document_frequency
+                )
+            matches.extend(
+                (other, PREFIX_WEIGHT, MAX_EXPANDED_POSTINGS) for other in longer
+            )
+
+        # words with digits are codes or numbers, not misspellings
+        if not matches and len(word) >= MIN_TYPO_LENGTH and word.isalpha():
+            typos = {self.term_ids.get(edit) for edit in edits(word)}
+            typos.discard(None)
+            typos = heapq.nlargest(MAX_TYPO_TERMS, typos, key=self.document_frequency)
+            matches.extend(
+                (other, TYPO_WEIGHT, MAX_EXPANDED_POSTINGS) for other in typos
+            )
+        return matches
+
+    def search(self, query, limit=10):
+        """
+        [(code, name, score)], best first.
+        """
+        # codes starting with the query come first, in code order, which puts
+        # an exact code ahead of its suffixed variants; a short word is only
+        # a code prefix when it's a whole department
+        results = []
+        found = set()
+        code = normalize_query_code(query)
+        if DIGIT.search(code) or code in self.department_set:
+            for doc in self.code_prefix(code):
+                results.append((self.codes[doc], self.names[doc], CODE_SCORE))
+                found.add(doc)
+                if len(results) == limit:
+                    return results
+
+        scores = {}
+        query_words = words(query)
+        for position, word in enumerate(query_words):
+            last = position == len(query_words) - 1
+            for term_id, weight, most in self.expand(word, prefix=last):
+                start = self.term_offsets[term_id]
+                end = min(self.term_offsets[term_id + 1], start + most)
+                docs = self.post_docs[start:end]
+                impacts = self.post_impacts[start:end]
+                for doc, impact in zip(docs, impacts):
+                    scores[doc] = scores.get(doc, 0) + weight * impact
+
+        ranked = ((doc, score) for doc, score in scores.items() if doc not in found)
+        best = heapq.nlargest(limit - len(results), ranked, key=lambda item: item[1])
+        results.extend(
+            (self.codes[doc], self.names[doc], score * self.impact_scale)
+            for doc, score in best
+        )
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Course search index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index a coursespider export")
+    build.add_argument("input", help="coursespider export, JSON array or JSON Lines")
+    build.add_argument("-o", "--output", default="course_search.idx")
+    build.add_argument(
+        "--school", default="ncsu", choices=sorted(SCHOOLS), help="code format"
+    )
+    query = commands.add_parser("query", help="search a built index")
+    query.add_argument("index")
+    query.add_argument("query")
+    query.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        school = get_school(args.school)
+        index = SearchIndex.build(iter_courses(args.input), school.code_pattern)
+        index.write(args.output)
+        print(
+            f"indexed {len(index.codes)} courses, {len(index.terms)} words in "
+            f"{time.perf_counter() - start:.2f}s, "
+            f"{os.path.getsize(args.output) / 1e6:.2f} MB"
+        )
+        return
+
+    index = SearchIndex.load(args.index)
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    elapsed = time.perf_counter() - start
+    for code, name, score in results:
+        print(f"{score:8.2f}  {code}  {name}")
+    print(f"loaded in {loaded * 1e3:.1f}ms, query took {elapsed * 1e3:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
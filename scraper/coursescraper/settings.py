@@ -53,19 +53,40 @@ ROBOTSTXT_OBEY = True
 # DOWNLOADER_MIDDLEWARES = {
 #    "coursescraper.middlewares.CoursescraperDownloaderMiddleware": 543,
 # }
+DOWNLOADER_MIDDLEWARES = {
+    "coursescraper.pagecache.PageCacheMiddleware": 900,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
 # EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
 # }
+EXTENSIONS = {
+    "coursescraper.profiles.CrawlSummary": 500,
+}
+
+# Concurrency and AutoThrottle come from a named profile, see
+# coursescraper/profiles.py: polite, fast or replay (-s CRAWL_PROFILE=fast)
+CRAWL_PROFILE = "polite"
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
     "coursescraper.pipelines.CoursescraperPipeline": 300,
+    "coursescraper.pipelines.CourseDeltaPipeline": 400,
+    "coursescraper.pipelines.SearchIndexPipeline": 500,
 }
 
+# Per-course hashes from the last crawl, and the added/changed/removed feed
+# CourseDeltaPipeline writes against them
+COURSE_MANIFEST = "course_manifest.json"
+COURSE_DELTA = "course_delta.jsonl"
+
+# Typeahead index over course codes, names and descriptions written at the end
+# of a finished crawl (coursescraper/search.py); unset to skip it
+SEARCH_INDEX = "course_search.idx"
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 # AUTOTHROTTLE_ENABLED = True
@@ -87,7 +108,20 @@ ITEM_PIPELINES = {
 # HTTPCACHE_IGNORE_HTTP_CODES = []
 # HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# Raw page cache with ETag/Last-Modified revalidation, see coursescraper/pagecache.py
+# Run with -s PAGECACHE_MODE=replay to crawl entirely from disk
+PAGECACHE_ENABLED = True
+PAGECACHE_MODE = "revalidate"
+PAGECACHE_DIR = "pagecache"
+# Serve entries younger than this without revalidating (0 = always revalidate)
+PAGECACHE_EXPIRATION_SECS = 0
+
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 FEED_EXPORT_ENCODING = "utf-8"
+# orjson-backed -o feed.json / feed.jsonl, see coursescraper/exporters.py
+FEED_EXPORTERS = {
+    "json": "coursescraper.exporters.JsonItemExporter",
+    "jsonlines": "coursescraper.exporters.JsonLinesItemExporter",
+}
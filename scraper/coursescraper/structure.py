@@ -0,0 +1,147 @@
+"""
+Whole-catalog structural checks on a coursespider export, meant to run
+before the LLM stage.
+
+    cd scraper
+    python -m coursescraper.structure ncsu_courses.json -o structural_issues.jsonl \\
+        --school ncsu
+
+Builds the prerequisite graph once and reports per course:
+    self-reference  a course listing itself as a requirement
+    cycle           courses that (transitively) require each other as
+                    prerequisites; lecture/lab corequisite pairs are fine
+    dangling        a required code that isn't in the catalog
+    inferred        a code built from a bare number by extract_course_codes
+                    (department carried over or taken from the course) that
+                    doesn't exist, or sits next to a test score
+    level jump      a prerequisite two or more levels above the course
+
+The output is JSON Lines of {"department", "code", "issues"}, the input
+data/llm-pipeline/index.py takes with --structural.
+"""
+
+import argparse
+import json
+import re
+import time
+
+from coursescraper.catalog import iter_courses
+from coursescraper.graph import PrereqGraph, normalize_code
+from coursescraper.restrictions import RestrictionParser
+from coursescraper.schools import SCHOOLS, get_school
+
+# shared with data/llm-pipeline/prefilter.py
+TEST_SCORE = re.compile(r"\b(?:SAT|ACT|AP|IB|score|scores|exam)\b", re.IGNORECASE)
+COURSE_NUMBER = re.compile(r"(\d{3})$")
+
+
+def course_level(code):
+    match = COURSE_NUMBER.search(code or "")
+    return int(match.group(1)) // 100 if match else None
+
+
+def level_jumps(code, prerequisites):
+    """
+    Yields (prerequisite, course level) for every prerequisite two or more
+    levels above the course, e.g. a 400-level course required by a 100-level
+    one.
+    """
+    level = course_level(code)
+    if level is None:
+        return
+    for requirement in prerequisites:
+        required_level = course_level(requirement)
+        if required_level is not None and required_level - level >= 2:
+            yield requirement, level
+
+
+def requirements(course):
+    return (course.get("prerequisites") or []) + (course.get("corequisites") or [])
+
+
+def course_issues(course, catalog, cycle_of, restriction_parser):
+    code = normalize_code(course["code"])
+    text = course.get("restrictions_text") or ""
+    explicit = {code for code, _ in restriction_parser.explicit_codes(text)}
+    issues = []
+
+    required = requirements(course)
+    if code in map(normalize_code, required):
+        issues.append("self-reference: lists itself as a requirement")
+
+    if code in cycle_of:
+        issues.append("cycle: " + " -> ".join(cycle_of[code]))
+
+    test_score = TEST_SCORE.search(text)
+    for requirement in dict.fromkeys(map(normalize_code, required)):
+        known = requirement in catalog
+        if requirement in explicit:
+            if not known:
+                issues.append(f"dangling: {requirement} is not in the catalog")
+        elif test_score:
+            issues.append(f"inferred: {requirement} from a number near a test score")
+        elif not known:
+            issues.append(f"inferred: {requirement} from a number, not in the catalog")
+
+    for requirement, level in level_jumps(code, course.get("prerequisites") or []):
+        issues.append(f"level jump: {requirement} required by a {level}00-level course")
+    return issues
+
+
+def validate(courses, restriction_parser=None):
+    """
+    Yields (course, issues) for every course with at least one issue.
+
+    restriction_parser: the school's (see coursescraper.schools), for its
+    code format.
+    """
+    restriction_parser = restriction_parser or RestrictionParser()
+    courses = list(courses)
+    catalog = {normalize_code(course["code"]) for course in courses}
+    # courses listing each other as corequisites (lecture and lab) are normal
+    graph = PrereqGraph.from_courses(courses, include_coreqs=False)
+    cycle_of = {}
+    for cycle in graph.cycles():
+        for code in cycle:
+            cycle_of[code] = cycle
+
+    for course in courses:
+        issues = course_issues(course, catalog, cycle_of, restriction_parser)
+        if issues:
+            yield course, issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structural checks on a crawl.")
+    parser.add_argument("input", help="coursespider export, JSON array or JSON Lines")
+    parser.add_argument("-o", "--output", default="structural_issues.jsonl")
+    parser.add_argument(
+        "--school", default="ncsu", choices=sorted(SCHOOLS), help="code format"
+    )
+    args = parser.parse_args()
+    restriction_parser = get_school(args.school).restriction_parser
+
+    start = time.perf_counter()
+    counts = {}
+    flagged = 0
+    with open(args.output, "w", encoding="utf-8") as f:
+        courses = iter_courses(args.input)
+        for course, issues in validate(courses, restriction_parser):
+            flagged += 1
+            for issue in issues:
+                kind = issue.split(":", 1)[0]
+                counts[kind] = counts.get(kind, 0) + 1
+            entry = {
+                "department": course.get("department"),
+                "code": course.get("code"),
+                "issues": issues,
+            }
+            f.write(json.dumps(entry) + "\n")
+
+    print(f"{flagged} courses flagged in {time.perf_counter() - start:.2f}s")
+    for kind, count in sorted(counts.items()):
+        print(f"{kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
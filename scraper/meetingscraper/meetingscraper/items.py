@@ -3,10 +3,29 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
-import scrapy
+from dataclasses import dataclass, field
 
 
-class MeetingscraperItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+@dataclass(slots=True)
+class MeetingTime:
+    days: str  # as shown on the page, "TT" for Tuesday/Thursday
+    time: str  # "1:30 PM - 2:45 PM", or "TBD"
+    day_mask: int = 0  # bit 0 Monday .. bit 6 Sunday
+    start: int = None  # minutes after midnight, None without a set time
+    end: int = None
+
+
+@dataclass(slots=True)
+class Section:
+    section: str
+    type: str
+    location: str
+    meeting: MeetingTime
+
+
+@dataclass(slots=True)
+class CourseSections:
+    term: str
+    department: str
+    course: str
+    sections: list = field(default_factory=list)
@@ -3,11 +3,33 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
-
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+from meetingscraper.store import SectionStore
 
 
 class MeetingscraperPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class SectionStorePipeline:
+    """
+    Writes every CourseSections item into the term-partitioned SectionStore
+    (MEETING_STORE_DIR). Items still go on to the feed (-o) unchanged.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings.get("MEETING_STORE_DIR", "meetings"))
+
+    def open_spider(self, spider):
+        self.store = SectionStore(self.directory)
+
+    def process_item(self, item, spider):
+        self.store.add(item.term, item.department, item.course, item.sections)
+        return item
+
+    def close_spider(self, spider):
+        self.store.close()
@@ -0,0 +1,254 @@
+"""
+Section meeting times as integers, and conflict checks on them.
+
+parse_sections gives every section's MeetingTime a day_mask (bit 0 Monday
+.. bit 6 Sunday) and start / end minutes after midnight, None for TBD and
+online sections, which never conflict with anything.
+
+ConflictIndex packs those into arrays, and per day keeps the sections sorted
+by start so "what overlaps 10:15-11:05 on Tuesday" is two bisects and a scan
+over sections starting inside the window. For building schedules each
+distinct meeting pattern also becomes a week mask, an int with one bit per
+minute of the week, so a whole partial schedule is one int and checking a
+candidate against it is one AND.
+
+combinations() picks one section per (course, type), so a course with a
+lecture and a lab needs one of each. Sections with the same meeting pattern
+are searched once and only expanded at the end, the slot with the fewest
+patterns goes first, and a branch is cut as soon as any remaining slot has
+no pattern left that fits.
+
+    cd scraper/meetingscraper
+    python -m meetingscraper.schedule 2251 CSC316 CSC326 MA341 ST370 --limit 5
+"""
+
+import argparse
+import re
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import product
+
+from meetingscraper.store import SectionStore, normalize_code
+
+MINUTES_PER_DAY = 24 * 60
+DAY_LETTERS = "MTWHFSU"
+TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*([AP])\.?M", re.IGNORECASE)
+
+
+# a term only has a few hundred distinct time strings
+@lru_cache(maxsize=4096)
+def parse_time(text):
+    """
+    (start, end) minutes after midnight for "1:30 PM - 2:45 PM", or
+    (None, None) for TBD and anything else without two times.
+    """
+    times = TIME_PATTERN.findall(text or "")
+    if len(times) != 2:
+        return None, None
+    minutes = []
+    for hours, mins, half in times:
+        hours = int(hours) % 12 + (12 if half.upper() == "P" else 0)
+        minutes.append(hours * 60 + int(mins))
+    return minutes[0], minutes[1]
+
+
+def day_letters(day_mask):
+    # H for Thursday, U for Sunday
+    return "".join(
+        letter for day, letter in enumerate(DAY_LETTERS) if day_mask >> day & 1
+    )
+
+
+def week_mask(day_mask, start, end):
+    if start is None or end is None or end <= start:
+        return 0
+    day = ((1 << (end - start)) - 1) << start
+    mask = 0
+    for weekday in range(len(DAY_LETTERS)):
+        if day_mask >> weekday & 1:
+            mask |= day << (weekday * MINUTES_PER_DAY)
+    return mask
+
+
+class ConflictIndex:
+    def __init__(self, sections):
+        """
+        sections: (course, items.Section) pairs, as SectionStore.sections
+        gives them.
+        """
+        self.courses = []
+        self.sections = []
+        self.day_masks = array("B")
+        self.starts = array("H")
+        self.ends = array("H")
+        self.week_masks = {}
+
+        by_day = [[] for _ in DAY_LETTERS]
+        for section_id, (course, section) in enumerate(sections):
+            self.courses.append(course)
+            self.sections.append(section)
+            start, end = section.meeting.start, section.meeting.end
+            timed = start is not None and end is not None and end > start
+            day_mask = section.meeting.day_mask if timed else 0
+            self.day_masks.append(day_mask)
+            self.starts.append(start if timed else 0)
+            self.ends.append(end if timed else 0)
+            for weekday in range(len(DAY_LETTERS)):
+                if day_mask >> weekday & 1:
+                    by_day[weekday].append((start, end, section_id))
+
+        # per day: starts, ends and ids sorted by start, plus the longest
+        # meeting, which bounds how far before a window an overlap can start
+        self.by_day = []
+        for meetings in by_day:
+            meetings.sort()
+            self.by_day.append(
+                (
+                    array("H", [meeting[0] for meeting in meetings]),
+                    array("H", [meeting[1] for meeting in meetings]),
+                    array("I", [meeting[2] for meeting in meetings]),
+                    max((end - start for start, end, _ in meetings), default=0),
+                )
+            )
+
+    def week_mask(self, section_id):
+        key = (
+            self.day_masks[section_id],
+            self.starts[section_id],
+            self.ends[section_id],
+        )
+        if key not in self.week_masks:
+            self.week_masks[key] = week_mask(*key)
+        return self.week_masks[key]
+
+    def overlapping(self, day_mask, start, end):
+        """
+        Ids of sections meeting at some point in [start, end) on any day in
+        day_mask.
+        """
+        found = set()
+        for weekday in range(len(DAY_LETTERS)):
+            if not day_mask >> weekday & 1:
+                continue
+            starts, ends, ids, longest = self.by_day[weekday]
+            first = bisect_left(starts, start - longest + 1)
+            last = bisect_left(starts, end)
+            for position in range(first, last):
+                if ends[position] > start:
+                    found.add(ids[position])
+        return found
+
+    def conflicts(self, schedule):
+        """
+        Sorted ids of sections that clash with any (day_mask, start, end)
+        meeting in schedule, e.g. the sections a student already has.
+        """
+        found = set()
+        for day_mask, start, end in schedule:
+            if start is not None and end is not None:
+                found |= self.overlapping(day_mask, start, end)
+        return sorted(found)
+
+    def slots(self, courses):
+        """
+        {(code, type): {week mask: [section ids]}} for the wanted courses.
+        """
+        wanted = {normalize_code(course) for course in courses}
+        slots = {}
+        for section_id, section in enumerate(self.sections):
+            code = normalize_code(self.courses[section_id])
+            if code in wanted:
+                patterns = slots.setdefault((code, section.type), {})
+                patterns.setdefault(self.week_mask(section_id), []).append(section_id)
+        return slots
+
+    def combinations(self, courses, busy=()):
+        """
+        Yields conflict-free schedules, lists of section ids with one section
+        per (course, type), around the (day_mask, start, end) meetings in
+        busy. Yields nothing if a course has no sections.
+        """
+        slots = self.slots(courses)
+        found = {code for code, _ in slots}
+        if any(normalize_code(course) not in found for course in courses):
+            return
+
+        taken = 0
+        for meeting in busy:
+            taken |= week_mask(*meeting)
+        options = sorted(
+            (list(patterns.items()) for patterns in slots.values()), key=len
+        )
+        chosen = []
+
+        def fits_rest(depth, taken):
+            return all(
+                any(not mask & taken for mask, _ in options[later])
+                for later in range(depth + 1, len(options))
+            )
+
+        def search(depth, taken):
+            if depth == len(options):
+                for ids in product(*chosen):
+                    yield list(ids)
+                return
+            for mask, ids in options[depth]:
+                if mask & taken:
+                    continue
+                if not fits_rest(depth, taken | mask):
+                    continue
+                chosen.append(ids)
+                yield from search(depth + 1, taken | mask)
+                chosen.pop()
+
+        yield from search(0, taken)
+
+    def label(self, section_id):
+        section = self.sections[section_id]
+        if self.day_masks[section_id]:
+            start, end = self.starts[section_id], self.ends[section_id]
+            when = (
+                f"{day_letters(self.day_masks[section_id])} "
+                f"{start // 60:02d}{start % 60:02d}-{end // 60:02d}{end % 60:02d}"
+            )
+        else:
+            when = "no set time"
+        return f"{self.courses[section_id]} {section.section} ({when})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conflict-free section schedules.")
+    parser.add_argument("term")
+    parser.add_argument("courses", nargs="+", help="e.g. CSC316 MA341")
+    parser.add_argument("--store", default="meetings", help="MEETING_STORE_DIR")
+    parser.add_argument("--limit", type=int, default=10, help="schedules to print")
+    args = parser.parse_args()
+
+    store = SectionStore(args.store)
+    try:
+        sections = list(store.sections(args.term, args.courses))
+    finally:
+        store.close()
+
+    start = time.perf_counter()
+    index = ConflictIndex(sections)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count = 0
+    for schedule in index.combinations(args.courses):
+        if count < args.limit:
+            print(", ".join(index.label(section_id) for section_id in schedule))
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{count} conflict-free schedules from {len(sections)} sections "
+        f"(index {built * 1e3:.2f}ms, search {elapsed * 1e3:.2f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Section rows out of the HTML search.php returns.
+
+parse_sections reads the fields MeetingSpider.parse used to get from
+scrapy.Selector CSS queries, but runs precompiled XPath straight on the lxml
+tree: each expression below is what parsel translates the old selector to,
+compiled once at import instead of going through the CSS translator and a
+Selector wrapper per node for every row.
+
+    table.section-table tr:not(:first-child):not(:last-child)   ROWS
+    .weekdisplay li.meet                                        MEETING_DAYS
+    abbr::text                                                  DAY_TEXT
+    td:nth-child(n)::text                                       cell(n)
+
+Each Section's MeetingTime also has the time as integers (see schedule.py):
+day_mask, with bit 0 for Monday through bit 6 for Sunday, and start / end
+in minutes after midnight (None when the time is TBD). "days" can't give
+the mask since Tuesday and Thursday both start with T, so the day comes from
+the abbr's title or text, or failing that the li's place in the week.
+"""
+
+from lxml import etree
+
+from meetingscraper.items import MeetingTime, Section
+from meetingscraper.schedule import parse_time
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_INDEX = {name: day for day, name in enumerate(DAY_NAMES)}
+
+
+def has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def cell(n):
+    return etree.XPath(
+        f"descendant-or-self::td[count(preceding-sibling::*) = {n - 1}]/text()",
+        smart_strings=False,
+    )
+
+
+COURSES = etree.XPath(f"descendant-or-self::section[{has_class('course')}]")
+ROWS = etree.XPath(
+    f"descendant-or-self::table[{has_class('section-table')}]/descendant::tr"
+    "[preceding-sibling::* and following-sibling::*]"
+)
+MEETING_DAYS = etree.XPath(
+    f"descendant-or-self::*[{has_class('weekdisplay')}]"
+    f"/descendant::li[{has_class('meet')}]"
+)
+DAY_TEXT = etree.XPath("descendant-or-self::abbr/text()", smart_strings=False)
+SECTION = cell(1)
+TYPE = cell(2)
+TIME = cell(5)
+LOCATION = cell(6)
+
+
+def parse_html(text):
+    # the same parser settings scrapy.Selector(text=...) uses, but etree's
+    # HTMLParser rather than lxml.html's, whose element class lookup runs in
+    # Python for every node touched
+    body = text.strip().replace("\x00", "").encode("utf-8") or b"<html/>"
+    parser = etree.HTMLParser(recover=True, encoding="utf-8", huge_tree=True)
+    root = etree.fromstring(body, parser=parser)
+    if root is None:
+        root = etree.fromstring(b"<html/>", parser=parser)
+    return root
+
+
+def first_text(texts):
+    return texts[0].strip() if texts else ""
+
+
+def own_text(element):
+    # what element/text() selects: its text and the tails of its children
+    found = [element.text] if element.text is not None else []
+    found.extend(child.tail for child in element if child.tail is not None)
+    return found
+
+
+def in_weekdisplay(element, row):
+    while element is not None:
+        if "weekdisplay" in (element.get("class") or "").split():
+            return True
+        if element is row:
+            return False
+        element = element.getparent()
+    return False
+
+
+def day_index(item, abbr):
+    if abbr is not None:
+        for name in (abbr.get("title"), abbr.text):
+            day = DAY_INDEX.get((name or "").strip()[:3].lower())
+            if day is not None:
+                return day
+    position = sum(1 for _ in item.itersiblings("li", preceding=True))
+    return min(position, len(DAY_NAMES) - 1)
+
+
+def walk_row(row):
+    """
+    (cells, days, day_mask) from one pass over the row, where cells[n - 1]
+    is the element td:nth-child(n) matches. None for rows the pass can't answer
+    exactly (cells nested in cells, a meeting day whose first abbr starts
+    with markup), which parse_row hands to the XPath expressions instead.
+    """
+    cells = [child for child in row if isinstance(child.tag, str)]
+    if sum(1 for _ in row.iter("td")) != sum(1 for c in cells if c.tag == "td"):
+        return None
+
+    days = []
+    day_mask = 0
+    for item in row.iter("li"):
+        if "meet" not in (item.get("class") or "").split():
+            continue
+        if not in_weekdisplay(item.getparent(), row):
+            continue
+        abbr = next(item.iter("abbr"), None)
+        if abbr is None or not abbr.text:
+            return None
+        days.append(abbr.text[0])
+        day_mask |= 1 << day_index(item, abbr)
+    return cells, days, day_mask
+
+
+def parse_row(row):
+    walked = walk_row(row)
+    if walked is None:
+        meeting_days = MEETING_DAYS(row)
+        section = first_text(SECTION(row))
+        kind = first_text(TYPE(row))
+        days = "".join(DAY_TEXT(day)[0][0] for day in meeting_days)
+        time = TIME(row)[-1].strip()
+        location = first_text(LOCATION(row))
+        day_mask = 0
+        for item in meeting_days:
+            day_mask |= 1 << day_index(item, next(item.iter("abbr"), None))
+    else:
+        cells, days, day_mask = walked
+
+        def column(n):
+            if n > len(cells) or cells[n - 1].tag != "td":
+                return []
+            return own_text(cells[n - 1])
+
+        section = first_text(column(1))
+        kind = first_text(column(2))
+        days = "".join(days)
+        time = column(5)[-1].strip()
+        location = first_text(column(6))
+
+    start, end = parse_time(time)
+    return Section(
+        section=section,
+        type=kind,
+        location=location,
+        meeting=MeetingTime(days, time, day_mask, start, end),
+    )
+
+
+def parse_sections(text):
+    """
+    Yields (course id, [Section]) for every course in a search.php
+    "html" payload, courses without section rows included.
+    """
+    for course in COURSES(parse_html(text)):
+        yield course.attrib["id"], [parse_row(row) for row in ROWS(course)]
@@ -7,6 +7,12 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import sys
+from pathlib import Path
+
+# shared crawl code (page cache etc.) lives in the sibling coursescraper project
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
 BOT_NAME = "meetingscraper"
 
 SPIDER_MODULES = ["meetingscraper.spiders"]
@@ -53,18 +59,34 @@ ROBOTSTXT_OBEY = True
 #DOWNLOADER_MIDDLEWARES = {
 #    "meetingscraper.middlewares.MeetingscraperDownloaderMiddleware": 543,
 #}
+DOWNLOADER_MIDDLEWARES = {
+    "coursescraper.pagecache.PageCacheMiddleware": 900,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
 #EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
 #}
+EXTENSIONS = {
+    "coursescraper.profiles.CrawlSummary": 500,
+}
+
+# Concurrency and AutoThrottle come from a named profile, see
+# coursescraper/profiles.py: polite, fast or replay (-s CRAWL_PROFILE=fast)
+CRAWL_PROFILE = "polite"
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 #ITEM_PIPELINES = {
 #    "meetingscraper.pipelines.MeetingscraperPipeline": 300,
 #}
+ITEM_PIPELINES = {
+    "meetingscraper.pipelines.SectionStorePipeline": 400,
+}
+
+# one SQLite file per term, see meetingscraper/store.py
+MEETING_STORE_DIR = "meetings"
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -87,6 +109,19 @@ ROBOTSTXT_OBEY = True
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# Raw page cache with ETag/Last-Modified revalidation, see coursescraper/pagecache.py
+# Run with -s PAGECACHE_MODE=replay to crawl entirely from disk
+PAGECACHE_ENABLED = True
+PAGECACHE_MODE = "revalidate"
+PAGECACHE_DIR = "pagecache"
+# Serve entries younger than this without revalidating (0 = always revalidate)
+PAGECACHE_EXPIRATION_SECS = 0
+
 # Set settings whose default value is deprecated to a future-proof value
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 FEED_EXPORT_ENCODING = "utf-8"
+# orjson-backed -o feed.json / feed.jsonl, see coursescraper/exporters.py
+FEED_EXPORTERS = {
+    "json": "coursescraper.exporters.JsonItemExporter",
+    "jsonlines": "coursescraper.exporters.JsonLinesItemExporter",
+}
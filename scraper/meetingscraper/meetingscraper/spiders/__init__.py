@@ -2,6 +2,11 @@ import scrapy
 from scrapy.http import FormRequest
 from urllib.parse import quote_plus
 
+from coursescraper.profiles import apply_profile
+from meetingscraper.items import CourseSections
+from meetingscraper.sections import parse_sections
+from meetingscraper.store import expand_terms
+
 # scraped directly using
 # [...document.querySelectorAll('#browse-menu a')].map(a => a.getAttribute('data-value'))
 departments = [
@@ -204,6 +209,17 @@ departments = [
 class MeetingSpider(scrapy.Spider):
     name = "meeting_spider"
     search_endpoint = "https://webappprd.acs.ncsu.edu/php/coursecat/search.php"
+    # default term; crawl others with -a terms=2248,2251 or -a terms=2238-2251
+    term = "2251"
+
+    def __init__(self, terms=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.terms = expand_terms(terms or self.term)
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        apply_profile(settings)
 
     def start_requests(self):
         headers = {
@@ -212,59 +228,49 @@ class MeetingSpider(scrapy.Spider):
             "x-requested-with": "XMLHttpRequest",
         }
 
+        # departments outer so every term has requests in flight from the start
         for dept in departments:
-            body = (
-                f"term=2251"
-                f"&subject={quote_plus(dept)}"
-                f"&course-inequality=%3D"
-                f"&course-number="
-                f"&course-career="
-                f"&session="
-                f"&start-time-inequality=%3C%3D"
-                f"&start-time="
-                f"&end-time-inequality=%3C%3D"
-                f"&end-time="
-                f"&instructor-name="
-                f"&current_strm=2251"
-            )
+            for term in self.terms:
+                yield self.search_request(term, dept, headers)
 
-            yield scrapy.Request(
-                self.search_endpoint,
-                method="POST",
-                headers=headers,
-                body=body,
-                callback=self.parse,
-                meta={"department": dept},  # pass dept through for reference
-            )
+    def search_request(self, term, dept, headers):
+        body = (
+            f"term={term}"
+            f"&subject={quote_plus(dept)}"
+            f"&course-inequality=%3D"
+            f"&course-number="
+            f"&course-career="
+            f"&session="
+            f"&start-time-inequality=%3C%3D"
+            f"&start-time="
+            f"&end-time-inequality=%3C%3D"
+            f"&end-time="
+            f"&instructor-name="
+            f"&current_strm={term}"
+        )
+
+        return scrapy.Request(
+            self.search_endpoint,
+            method="POST",
+            headers=headers,
+            body=body,
+            callback=self.parse,
+            meta={
+                "department": dept,  # pass dept through for reference
+                "term": term,
+                # search.php is one url for every POST; cache by term + dept
+                "cache_key": f"{term}/{dept}",
+                "cache_partition": term,
+            },
+        )
 
     def parse(self, response):
         data = response.json()
-        sel = scrapy.Selector(text=data["html"])
-
-        for course in sel.css("section.course"):
-            course_id = course.attrib["id"]
-            sections = []
-            for row in course.css(
-                "table.section-table tr:not(:first-child):not(:last-child)"
-            ):
-                days = [
-                    d.css("abbr::text").get()[0]
-                    for d in row.css(".weekdisplay li.meet")
-                ]
-
-                sections.append(
-                    {
-                        "section": row.css("td:nth-child(1)::text").get("").strip(),
-                        "type": row.css("td:nth-child(2)::text").get("").strip(),
-                        "days": "".join(days),
-                        "time": row.css("td:nth-child(5)::text").getall()[-1].strip(),
-                        "location": row.css("td:nth-child(6)::text").get("").strip(),
-                    }
-                )
-
+        for course_id, sections in parse_sections(data["html"]):
             if sections:
-                yield {
-                    "department": response.meta["department"],
-                    "course": course_id,
-                    "sections": sections,
-                }
+                yield CourseSections(
+                    term=response.meta["term"],
+                    department=response.meta["department"],
+                    course=course_id,
+                    sections=sections,
+                )
@@ -0,0 +1,330 @@
+"""
+Term-partitioned store of crawled sections.
+
+Every term gets its own SQLite file, <store>/<term>.sqlite, holding one row
+per section with indexes on course code and department. A re-crawl of a
+term replaces each course's rows in that file; dropping a term is deleting
+its file.
+
+    cd scraper/meetingscraper
+    scrapy crawl meeting_spider -a terms=2238-2251
+    python -m meetingscraper.store terms
+    python -m meetingscraper.store offered CSC316 --season fall
+    python -m meetingscraper.store export sections_parquet/
+
+Term codes are NCSU strm numbers, 2 + two-digit year + session digit:
+1 spring, 6 summer 1, 7 summer 2, 8 fall (2248 is fall 2024). Ranges only
+expand to those sessions.
+
+Files record their layout version (PRAGMA user_version). Files from before
+the integer meeting columns (day_mask, start, end) get them added and filled
+in from the days and time text when they are opened. "days" can't tell
+Tuesday from Thursday (or Saturday from Sunday) on its own; where its order
+doesn't settle it, the row counts as meeting on both until the term is
+re-crawled.
+
+export writes the same data as Parquet partitioned by term
+(sections_parquet/term=2251/sections.parquet), which needs pyarrow.
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from meetingscraper.items import MeetingTime, Section
+
+SEASONS = {"1": "spring", "6": "summer 1", "7": "summer 2", "8": "fall"}
+COLUMNS = (
+    "department",
+    "course",
+    "code",
+    "section",
+    "type",
+    "days",
+    "time",
+    "location",
+    "day_mask",
+    "start",
+    "end",
+)
+
+SCHEMA_VERSION = 2
+# columns added after the first layout
+ADDED_COLUMNS = {"day_mask": "INTEGER", "start": "INTEGER", "end": "INTEGER"}
+# the days letters the spider stored, and the weekdays (bit 0 Monday) each
+# can stand for
+DAY_CANDIDATES = {"M": (0,), "T": (1, 3), "W": (2,), "H": (3,), "F": (4,), "S": (5, 6)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    department TEXT NOT NULL,
+    course TEXT NOT NULL,
+    code TEXT NOT NULL,
+    section TEXT,
+    type TEXT,
+    days TEXT,
+    time TEXT,
+    location TEXT,
+    day_mask INTEGER,
+    start INTEGER,
+    end INTEGER
+);
+CREATE INDEX IF NOT EXISTS sections_code ON sections (code);
+CREATE INDEX IF NOT EXISTS sections_department ON sections (department, course);
+"""
+
+
+def expand_terms(spec):
+    """
+    "2248,2251" or "2238-2251" (or a mix) to a sorted list of term codes.
+    """
+    terms = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        if not end:
+            terms.add(start)
+            continue
+        for term in range(int(start), int(end) + 1):
+            if str(term)[-1] in SEASONS:
+                terms.add(str(term))
+    return sorted(terms)
+
+
+def legacy_day_mask(days):
+    """
+    day_mask for a days string like "MTWTF" or "TT". Days are listed in week
+    order, so a letter can only be a weekday after the one before it; readings
+    that stay ambiguous (a lone "T") are OR-ed together.
+    """
+    readings = {(-1, 0)}  # (last weekday, mask)
+    for letter in (days or "").upper():
+        candidates = DAY_CANDIDATES.get(letter)
+        if not candidates:
+            continue
+        readings = {
+            (day, mask | 1 << day)
+            for last, mask in readings
+            for day in candidates
+            if day > last
+        }
+    mask = 0
+    for _, reading in readings:
+        mask |= reading
+    return mask
+
+
+def season(term):
+    return SEASONS.get(str(term)[-1])
+
+
+def normalize_code(course):
+    # "CSC-316" as scraped, "CSC 316" as typed
+    return re.sub(r"[^A-Z0-9]", "", course.upper())
+
+
+class SectionStore:
+    def __init__(self, directory, commit_every=500):
+        self.directory = Path(directory)
+        self.commit_every = commit_every
+        self.connections = {}
+        self.pending = {}
+
+    def connection(self, term, create=True):
+        term = str(term)
+        if term not in self.connections:
+            path = self.directory / f"{term}.sqlite"
+            if not create and not path.exists():
+                return None
+            self.directory.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(path)
+            connection.executescript(SCHEMA)
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            if version < SCHEMA_VERSION:
+                self.migrate(connection)
+            self.connections[term] = connection
+            self.pending[term] = 0
+        return self.connections[term]
+
+    def migrate(self, connection):
+        """
+        Adds the columns an older term file is missing and fills them in from
+        the stored text, then marks the file as current.
+        """
+        # schedule imports this module
+        from meetingscraper.schedule import parse_time
+
+        existing = {row[1] for row in connection.execute("PRAGMA table_info(sections)")}
+        missing = [column for column in ADDED_COLUMNS if column not in existing]
+        for column in missing:
+            connection.execute(
+                f"ALTER TABLE sections ADD COLUMN {column} {ADDED_COLUMNS[column]}"
+            )
+        if missing:
+            rows = connection.execute("SELECT rowid, days, time FROM sections")
+            connection.executemany(
+                "UPDATE sections SET day_mask = ?, start = ?, end = ? WHERE rowid = ?",
+                [
+                    (legacy_day_mask(days), *parse_time(time), rowid)
+                    for rowid, days, time in rows.fetchall()
+                ],
+            )
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        connection.commit()
+
+    def add(self, term, department, course, sections):
+        """
+        Replaces the course's sections (items.Section) in that term.
+        """
+        connection = self.connection(term)
+        connection.execute(
+            "DELETE FROM sections WHERE department = ? AND course = ?",
+            (department, course),
+        )
+        code = normalize_code(course)
+        connection.executemany(
+            "INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    department,
+                    course,
+                    code,
+                    section.section,
+                    section.type,
+                    section.meeting.days,
+                    section.meeting.time,
+                    section.location,
+                    section.meeting.day_mask,
+                    section.meeting.start,
+                    section.meeting.end,
+                )
+                for section in sections
+            ],
+        )
+        self.pending[str(term)] += 1
+        if self.pending[str(term)] >= self.commit_every:
+            connection.commit()
+            self.pending[str(term)] = 0
+
+    def terms(self):
+        if not self.directory.exists():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.sqlite"))
+
+    def select(self, query, params=(), terms=None):
+        """
+        Runs the query against each term's file, yielding (term, row).
+        """
+        for term in self.terms() if terms is None else terms:
+            connection = self.connection(term, create=False)
+            if connection is None:
+                continue
+            for row in connection.execute(query, params):
+                yield term, row
+
+    def sections(self, term, courses):
+        """
+        (course, Section) for every section of the given courses in one term.
+        """
+        codes = sorted({normalize_code(course) for course in courses})
+        if not codes:
+            # "IN ()" isn't valid SQLite
+            return
+        query = (
+            "SELECT course, section, type, location, days, time, day_mask, start, end "
+            f"FROM sections WHERE code IN ({', '.join('?' * len(codes))}) "
+            "ORDER BY code, section"
+        )
+        for _, row in self.select(query, codes, [str(term)]):
+            course, section, kind, location, *meeting = row
+            yield course, Section(section, kind, location, MeetingTime(*meeting))
+
+    def offered(self, course, terms=None):
+        """
+        {term: section count} for every term the course has sections in.
+        """
+        query = "SELECT count(*) FROM sections WHERE code = ?"
+        return {
+            term: count
+            for term, (count,) in self.select(query, (normalize_code(course),), terms)
+            if count
+        }
+
+    def export_parquet(self, out_dir, terms=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+        written = {}
+        for term in self.terms() if terms is None else terms:
+            connection = self.connection(term, create=False)
+            if connection is None:
+                continue
+            rows = connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM sections ORDER BY code, section"
+            ).fetchall()
+            table = pa.table(
+                {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)}
+            )
+            path = Path(out_dir) / f"term={term}" / "sections.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table, path)
+            written[term] = len(rows)
+        return written
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.commit()
+            connection.close()
+        self.connections = {}
+        self.pending = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the section store.")
+    parser.add_argument("--store", default="meetings", help="MEETING_STORE_DIR")
+    parser.add_argument("--terms", help="limit to these terms, e.g. 2238-2251")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("terms", help="stored terms and their section counts")
+    offered = commands.add_parser("offered", help="terms a course had sections in")
+    offered.add_argument("course")
+    offered.add_argument("--season", choices=sorted(set(SEASONS.values())))
+    export = commands.add_parser("export", help="write Parquet partitioned by term")
+    export.add_argument("out_dir")
+    args = parser.parse_args()
+
+    store = SectionStore(args.store)
+    terms = expand_terms(args.terms) if args.terms else store.terms()
+    start = time.perf_counter()
+    try:
+        if args.command == "terms":
+            query = "SELECT count(*), count(DISTINCT code) FROM sections"
+            for term, (sections, courses) in store.select(query, terms=terms):
+                print(
+                    f"{term} ({season(term)}): {courses} courses, {sections} sections"
+                )
+
+        elif args.command == "offered":
+            if args.season:
+                terms = [term for term in terms if season(term) == args.season]
+            offered = store.offered(args.course, terms)
+            for term, count in offered.items():
+                print(f"{term} ({season(term)}): {count} sections")
+            print(f"offered in {len(offered)} of {len(terms)} terms")
+
+        elif args.command == "export":
+            for term, count in store.export_parquet(args.out_dir, terms).items():
+                print(f"{term}: {count} sections")
+    finally:
+        store.close()
+    print(f"took {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
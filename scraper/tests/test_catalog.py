@@ -0,0 +1,21 @@
+import io
+
+import pytest
+
+from coursescraper.catalog import iter_json_array
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1 << 16])
+def test_json_array_in_chunks(chunk_size):
+    text = '[{"code": "CSC116", "hours": [3, 4]}, 12345, "x"]\n'
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == [
+        {"code": "CSC116", "hours": [3, 4]},
+        12345,
+        "x",
+    ]
+
+
+@pytest.mark.parametrize("text", ["[1 2]", "[1]x", "[1,]", "[,1]", "[1"])
+def test_malformed_json_array(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 2))
@@ -0,0 +1,60 @@
+from coursescraper.eligibility import EligibilityIndex
+from coursescraper.requirements import RequirementParser
+
+JUNIOR_OR_PERMISSION = {
+    "op": "or",
+    "args": [{"standing": "junior"}, {"permission": True}],
+}
+
+
+def test_standing_or_permission_in_a_prerequisite():
+    tree = RequirementParser().parse(
+        "Prerequisite: Junior standing or permission of instructor", "CSC"
+    )
+    assert tree == JUNIOR_OR_PERMISSION
+
+
+def test_standing_or_permission_after_a_prerequisite():
+    tree = RequirementParser().parse(
+        "Prerequisite: CSC 216; Junior standing or permission of instructor", "CSC"
+    )
+    assert tree == {"op": "and", "args": [{"course": "CSC216"}, JUNIOR_OR_PERMISSION]}
+
+
+def test_permission_is_reported_separately():
+    parser = RequirementParser()
+    courses = [
+        {
+            "code": "CSC401",
+            "prerequisite_tree": parser.parse(
+                "Prerequisite: Junior standing or permission of instructor", "CSC"
+            ),
+        },
+        {
+            "code": "CSC402",
+            "prerequisite_tree": parser.parse("Prerequisite: Junior standing", "CSC"),
+        },
+        {
+            "code": "CSC417",
+            "prerequisite_tree": parser.parse(
+                "Prerequisite: CSC 316 or permission of instructor", "CSC"
+            ),
+        },
+    ]
+    index = EligibilityIndex(courses)
+    assert index.eligible([]) == []
+    assert index.with_permission([]) == ["CSC401", "CSC417"]
+    assert index.eligible(["CSC316"], "junior") == ["CSC401", "CSC402", "CSC417"]
+    assert index.with_permission(["CSC316"], "junior") == []
+
+
+def test_another_schools_code_pattern():
+    parser = RequirementParser(r"([A-Z]{2,5})[-\s]?(\d{4})|(\d{4})")
+    tree = parser.parse("Prerequisite: COMP-1010 and (MATH 2200 or 2300)", "COMP")
+    assert tree == {
+        "op": "and",
+        "args": [
+            {"course": "COMP1010"},
+            {"op": "or", "args": [{"course": "MATH2200"}, {"course": "MATH2300"}]},
+        ],
+    }
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from parsel import Selector
+
+from coursescraper.items import CourseItem
+from coursescraper.schools import get_school
+
+CATALOG_PAGE = Path(__file__).parent / "data" / "ncsu_csc.html"
+
+
+def test_ncsu_department_links():
+    school = get_school("ncsu")
+    page = Selector(text=CATALOG_PAGE.read_text(encoding="utf-8"))
+    links = school.department_links(page)
+    assert links == ["/course-descriptions/csc/", "/course-descriptions/ma/"]
+    assert [school.department(link) for link in links] == ["CSC", "MA"]
+
+
+def test_ncsu_parse_course():
+    school = get_school("ncsu")
+    page = Selector(text=CATALOG_PAGE.read_text(encoding="utf-8"))
+    blocks = school.course_blocks(page)
+    courses = [school.parse_course(block, "CSC") for block in blocks]
+    assert courses[0] == CourseItem(
+        department="CSC",
+        code="CSC316",
+        name="Data Structures and Algorithms",
+        hours="(3 credit hours)",
+        # text and link text joined in page order; the pipeline cleans up
+        description="Abstract data types and their implementations, using  CSC 216 "
+        " skills.",
+        restrictions_text="Prerequisite:  CSC\xa0226  and  CSC\xa0216  with a grade "
+        "of C or better",
+    )
+    # a code that is itself a link
+    assert courses[1].code == "CSC116"
+    assert courses[1].restrictions_text is None
@@ -0,0 +1,31 @@
+from coursescraper.search import CODE_SCORE, SearchIndex
+
+COURSES = [
+    {"code": "CSC316", "name": "Data Structures and Algorithms", "description": ""},
+    {"code": "DATA101", "name": "Introduction to Data", "description": ""},
+    {"code": "ST311", "name": "Introduction to Statistics", "description": ""},
+]
+
+
+def search(index, query):
+    return [(code, score == CODE_SCORE) for code, _, score in index.search(query)]
+
+
+def test_a_department_or_a_digit_is_a_code_query():
+    index = SearchIndex.build(COURSES)
+    assert search(index, "csc")[0] == ("CSC316", True)
+    assert search(index, "st 3")[0] == ("ST311", True)
+
+
+def test_a_short_word_is_not_a_code_prefix():
+    index = SearchIndex.build(COURSES)
+    assert ("ST311", True) not in search(index, "stat")
+    assert [code for code, _ in search(index, "stat")] == ["ST311"]
+
+
+def test_departments_come_from_the_schools_code_pattern():
+    assert search(SearchIndex.build(COURSES), "data")[0] == ("DATA101", True)
+    # four digit codes: DATA101 isn't one, so DATA isn't a department
+    index = SearchIndex.build(COURSES, r"([A-Z]{2,5})[-\s]?(\d{4})|(\d{4})")
+    assert index.departments == []
+    assert ("DATA101", True) not in search(index, "data")
@@ -0,0 +1,49 @@
+from coursescraper.restrictions import RestrictionParser
+from coursescraper.structure import validate
+
+
+def course(code, prerequisites=(), corequisites=(), text=""):
+    return {
+        "department": code[:3],
+        "code": code,
+        "restrictions_text": text,
+        "prerequisites": list(prerequisites),
+        "corequisites": list(corequisites),
+    }
+
+
+def test_mutual_corequisites_are_not_a_cycle():
+    courses = [
+        course("CH101", corequisites=["CH102"], text="Corequisite: CH 102"),
+        course("CH102", corequisites=["CH101"], text="Corequisite: CH 101"),
+    ]
+    assert list(validate(courses)) == []
+
+
+def test_mutual_prerequisites_are_a_cycle():
+    courses = [
+        course("CSC316", prerequisites=["CSC216"], text="Prerequisite: CSC 216"),
+        course("CSC216", prerequisites=["CSC316"], text="Prerequisite: CSC 316"),
+    ]
+    flagged = {entry["code"]: issues for entry, issues in validate(courses)}
+    assert flagged == {
+        "CSC216": ["cycle: CSC216 -> CSC316"],
+        "CSC316": ["cycle: CSC216 -> CSC316"],
+    }
+
+
+def test_corequisite_outside_the_catalog_is_dangling():
+    courses = [course("CH101", corequisites=["CH999"], text="Corequisite: CH 999")]
+    assert list(validate(courses)) == [
+        (courses[0], ["dangling: CH999 is not in the catalog"])
+    ]
+
+
+def test_explicit_codes_in_another_schools_format():
+    parser = RestrictionParser(r"([A-Z]{2,5})[-\s]?(\d{4})|(\d{4})")
+    courses = [
+        course("COMP2000", prerequisites=["COMP1010"], text="Prerequisite: COMP-1010")
+    ]
+    assert list(validate(courses, parser)) == [
+        (courses[0], ["dangling: COMP1010 is not in the catalog"])
+    ]
@@ -0,0 +1,60 @@
+import fs from "fs";
+
+// Reader for the precomputed dependency artifact written by
+// `python -m coursescraper.artifact build` (see that module for the layout).
+const MAGIC = "SYLBART1";
+const FORMAT = 1;
+
+export function loadArtifact(path) {
+  const buffer = fs.readFileSync(path);
+  if (buffer.toString("latin1", 0, 8) !== MAGIC) {
+    throw new Error(`${path} is not a dependency artifact`);
+  }
+
+  const headerLength = buffer.readUInt32LE(8);
+  const header = JSON.parse(buffer.toString("utf8", 12, 12 + headerLength));
+  if (header.format !== FORMAT) {
+    throw new Error(`Unsupported artifact format ${header.format}`);
+  }
+
+  const codeWidth = header.code_width;
+  const recordSize = codeWidth + 12;
+  const indexStart = 12 + headerLength;
+  const dataStart = indexStart + header.courses * recordSize;
+
+  const codeAt = (position) => {
+    const start = indexStart + position * recordSize;
+    const end = buffer.indexOf(0, start);
+    return buffer.toString(
+      "latin1",
+      start,
+      end === -1 || end > start + codeWidth ? start + codeWidth : end
+    );
+  };
+
+  // Binary search over the fixed-width index, so nothing is parsed up front
+  const get = (code) => {
+    let low = 0;
+    let high = header.courses;
+    while (low < high) {
+      const middle = (low + high) >> 1;
+      const found = codeAt(middle);
+      if (found === code) {
+        const record = indexStart + middle * recordSize + codeWidth;
+        const offset = Number(buffer.readBigUInt64LE(record));
+        const length = buffer.readUInt32LE(record + 8);
+        return JSON.parse(
+          buffer.toString("utf8", dataStart + offset, dataStart + offset + length)
+        );
+      }
+      if (found < code) {
+        low = middle + 1;
+      } else {
+        high = middle;
+      }
+    }
+    return null;
+  };
+
+  return { header, get };
+}
@@ -2,6 +2,7 @@ import express from "express";
 import neo4j from "neo4j-driver";
 const router = express.Router();
 import "dotenv/config.js";
+import { loadArtifact } from "./artifact.js";
 
 const username = process.env.NEO4J_USERNAME;
 const password = process.env.NEO4J_PASSWORD;
@@ -17,6 +18,17 @@ await driver.verifyConnectivity();
 const dependencyCache = new Map();
 const courseInfoCache = new Map();
 
+// Precomputed course info and dependencies, so lookups are hits from the start
+const artifact = process.env.DEPENDENCY_ARTIFACT
+  ? loadArtifact(process.env.DEPENDENCY_ARTIFACT)
+  : null;
+if (artifact) {
+  console.log(
+    `Loaded dependency artifact ${artifact.header.version.slice(0, 12)} ` +
+      `(${artifact.header.courses} courses)`
+  );
+}
+
 // Cache duration - 24 hours in milliseconds
 const CACHE_DURATION = 24 * 60 * 60 * 1000;
 
@@ -39,6 +51,11 @@ router.get(
         return res.json(dependencyCache.get(courseCode));
       }
 
+      const entry = artifact?.get(courseCode);
+      if (entry) {
+        return res.json(entry.dependencies);
+      }
+
       const session = driver.session();
       const result = await session.run(
         "MATCH (c:Course {code: $courseCode}) -[:REQUIRES]->(n:Course) RETURN n.code as code",
@@ -69,6 +86,11 @@ router.get("/course/:code", checkLocalStorage, async (req, res) => {
       return res.json(courseInfoCache.get(courseCode));
     }
 
+    const entry = artifact?.get(courseCode);
+    if (entry) {
+      return res.json(entry.info);
+    }
+
     const session = driver.session();
     const result = await session.run(
       "MATCH (c:Course {code: $courseCode}) RETURN c",